@@ -1,11 +1,68 @@
+import time
+_started = time.perf_counter()
+
 import sys
+from utils.startup_profile import StartupProfile
+
+# Pass --profile-startup to print a timing breakdown once the main window is up
+profile = StartupProfile(enabled="--profile-startup" in sys.argv, started=_started)
+
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
-from ui.main_window import ImageTimerApp
-from storage import init_db
+profile.mark("import PyQt6")
+from storage import init_db, close_connection
+profile.mark("import storage")
+
+
+def shutdown():
+    # Imported here so startup doesn't pay for the playback modules
+    from utils.practice_log import close_practice_log
+    from utils.image_meta import stop_meta_scanner
+    from utils.thumbnail_cache import flush_thumbnail_cache
+    stop_meta_scanner()
+    close_practice_log()
+    flush_thumbnail_cache()
+    close_connection()
+
+
+def start_meta_scan():
+    # Refresh image_meta in the background once the window is up
+    from utils.image_meta import get_meta_scanner
+    get_meta_scanner().request()
+
+
+def dedupe():
+    """Merge duplicate images in an existing library, print what happened and exit."""
+    from storage import get_connection
+    from utils.content_hash import dedupe_library
+    by_path, by_content, hashed = dedupe_library(
+        get_connection(), on_progress=lambda done: print(f"Hashed {done} images...", flush=True)
+    )
+    print(f"Hashed {hashed} images. Merged {by_path} duplicate paths and {by_content} duplicate files.")
+    close_connection()
+
 
 if __name__ == "__main__":
     init_db()
-    app = QApplication(sys.argv)
+    profile.mark("init_db")
+    # Pass --dedupe to clean up a library imported before duplicates were detected
+    if "--dedupe" in sys.argv:
+        dedupe()
+        sys.exit(0)
+    app = QApplication([arg for arg in sys.argv if arg != "--profile-startup"])
+    app.aboutToQuit.connect(shutdown)
+    profile.mark("QApplication")
+    from ui.main_window import ImageTimerApp
+    profile.mark("import ui.main_window")
     window = ImageTimerApp()
+    profile.mark("ImageTimerApp()")
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+
+    def on_first_paint():
+        profile.mark("show + first paint")
+        profile.report()
+        start_meta_scan()
+
+    # Runs once the event loop has processed the first show/paint events
+    QTimer.singleShot(0, on_first_paint)
+    sys.exit(app.exec())
@@ -1,10 +1,102 @@
 import sqlite3
+import threading
 
-# Initialize database
-def init_db():
-    conn = sqlite3.connect("image_timer.db")
-    cursor = conn.cursor()
-    
+DB_PATH = "image_timer.db"
+
+# Connection tuning applied to every connection we open
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -32000",  # Negative value is in KiB (~32MB page cache)
+    "PRAGMA mmap_size = 268435456",  # Map up to 256MB of the database file
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Number of prepared statements sqlite3 keeps per connection
+STATEMENT_CACHE_SIZE = 256
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def open_connection(path=None):
+    """Open a new tuned connection. Worker threads use this for their own connection."""
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection():
+    """Return the shared long-lived connection for this process."""
+    global _connection
+    if _connection is None:
+        with _connection_lock:
+            if _connection is None:
+                _connection = open_connection()
+    return _connection
+
+
+def close_connection():
+    """Close the shared connection (called on application exit)."""
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            _connection.execute("PRAGMA optimize")
+            _connection.close()
+            _connection = None
+
+
+def fetch_all(sql, params=()):
+    """Run a read query on the shared connection and return all rows."""
+    return get_connection().execute(sql, params).fetchall()
+
+
+def fetch_one(sql, params=()):
+    """Run a read query on the shared connection and return the first row."""
+    return get_connection().execute(sql, params).fetchone()
+
+
+def execute(sql, params=()):
+    """Run a single write statement and commit it."""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute(sql, params)
+    return cursor
+
+
+def execute_many(sql, rows):
+    """Run a write statement for many rows inside a single transaction."""
+    conn = get_connection()
+    with conn:
+        cursor = conn.executemany(sql, rows)
+    return cursor
+
+
+def get_setting(key, default=None):
+    """Read a value from the settings table."""
+    row = fetch_one("SELECT value FROM settings WHERE key = ?", (key,))
+    return row[0] if row is not None else default
+
+
+def set_setting(key, value):
+    """Store a value in the settings table."""
+    execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def transaction():
+    """Context manager grouping several writes into one commit on the shared connection."""
+    return get_connection()
+
+
+# Schema migrations, applied in order. PRAGMA user_version records how many have run.
+def _migration_base_schema(cursor):
     # Create table for storing images
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS images (
@@ -13,7 +105,7 @@ def init_db():
             collection TEXT NOT NULL
         )
     ''')
-    
+
     # Create table for storing collections
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS collections (
@@ -21,7 +113,7 @@ def init_db():
             name TEXT UNIQUE NOT NULL
         )
     ''')
-    
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS collection_images (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -31,7 +123,7 @@ def init_db():
             FOREIGN KEY (image_id) REFERENCES images(id)
         )
     ''')
-    
+
     # Create table for settings (last used configurations)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS settings (
@@ -39,7 +131,7 @@ def init_db():
             value TEXT
         )
     ''')
-    
+
     # Create table for session configurations
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS sessions (
@@ -48,6 +140,245 @@ def init_db():
             duration TEXT NOT NULL
         )
     ''')
-    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+
+
+def _migration_collection_links(cursor):
+    # Rebuild collection_images with cascading foreign keys and one row per link.
+    # Links to images or collections that no longer exist are dropped on the way.
+    cursor.execute('''
+        CREATE TABLE collection_images_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            collection_id INTEGER NOT NULL REFERENCES collections(id) ON DELETE CASCADE,
+            image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+            UNIQUE (collection_id, image_id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO collection_images_new (id, collection_id, image_id)
+        SELECT MIN(ci.id), ci.collection_id, ci.image_id
+        FROM collection_images ci
+        JOIN collections c ON c.id = ci.collection_id
+        JOIN images i ON i.id = ci.image_id
+        GROUP BY ci.collection_id, ci.image_id
+    ''')
+    cursor.execute("DROP TABLE collection_images")
+    cursor.execute("ALTER TABLE collection_images_new RENAME TO collection_images")
+
+    # The UNIQUE constraint covers (collection_id, image_id); this one serves cascades
+    # and "which collections contain this image" lookups.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_collection_images_image ON collection_images (image_id, collection_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_images_path ON images (path)")
+
+
+def _migration_session_plans(cursor):
+    # Compiled form of sessions.duration (see utils.session_utils.SessionPlan.encode).
+    # Left NULL here; it is filled in the first time each session is loaded.
+    cursor.execute("ALTER TABLE sessions ADD COLUMN plan TEXT")
+
+
+def _migration_recent_images(cursor):
+    # Images recently shown per collection, for the no-repeat shuffle
+    # (utils.shuffle_scheduler). collection_id is -1 for "All", so it can't be
+    # a foreign key; a trigger clears a collection's rows when it is deleted.
+    cursor.execute('''
+        CREATE TABLE recent_images (
+            collection_id INTEGER NOT NULL,
+            image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+            shown_at REAL NOT NULL,
+            PRIMARY KEY (collection_id, image_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX idx_recent_images_shown ON recent_images (collection_id, shown_at)")
+    cursor.execute("CREATE INDEX idx_recent_images_image ON recent_images (image_id)")
+    cursor.execute('''
+        CREATE TRIGGER recent_images_collection_deleted AFTER DELETE ON collections
+        BEGIN
+            DELETE FROM recent_images WHERE collection_id = OLD.id;
+        END
+    ''')
+
+
+def _migration_practice_log(cursor):
+    # One practice_sessions row per player window, one practice_log row per image shown.
+    # image_id is NULLed rather than deleted with the image so totals stay intact.
+    cursor.execute('''
+        CREATE TABLE practice_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mode TEXT NOT NULL,
+            collection_id INTEGER,
+            plan TEXT,
+            started_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE practice_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL REFERENCES practice_sessions(id) ON DELETE CASCADE,
+            image_id INTEGER REFERENCES images(id) ON DELETE SET NULL,
+            collection_id INTEGER,
+            ended_at REAL NOT NULL,
+            planned_seconds REAL NOT NULL,
+            actual_seconds REAL NOT NULL,
+            skipped INTEGER NOT NULL DEFAULT 0,
+            soft_skipped INTEGER NOT NULL DEFAULT 0,
+            went_back INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("CREATE INDEX idx_practice_log_image ON practice_log (image_id, ended_at)")
+    cursor.execute("CREATE INDEX idx_practice_log_time ON practice_log (ended_at)")
+    cursor.execute("CREATE INDEX idx_practice_log_session ON practice_log (session_id)")
+    cursor.execute("CREATE INDEX idx_practice_sessions_started ON practice_sessions (started_at)")
+
+
+def _migration_practice_rollups(cursor):
+    # Running totals for the statistics window, kept up to date by a trigger on
+    # practice_log so opening it never aggregates the raw log. Weeks are summed
+    # from practice_daily, which only grows by one row per day.
+    cursor.execute('''
+        CREATE TABLE practice_daily (
+            day TEXT PRIMARY KEY,
+            seconds REAL NOT NULL,
+            images INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE practice_collection_totals (
+            collection_id INTEGER PRIMARY KEY,
+            seconds REAL NOT NULL,
+            images INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE practice_image_totals (
+            image_id INTEGER PRIMARY KEY REFERENCES images(id) ON DELETE CASCADE,
+            seconds REAL NOT NULL,
+            shown INTEGER NOT NULL,
+            last_shown REAL NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX idx_practice_image_totals_shown ON practice_image_totals (shown, seconds)")
+    cursor.execute('''
+        CREATE TRIGGER practice_log_rollup AFTER INSERT ON practice_log
+        BEGIN
+            INSERT INTO practice_daily (day, seconds, images)
+            VALUES (date(NEW.ended_at, 'unixepoch', 'localtime'), NEW.actual_seconds, 1)
+            ON CONFLICT (day) DO UPDATE SET
+                seconds = seconds + excluded.seconds, images = images + 1;
+
+            INSERT INTO practice_collection_totals (collection_id, seconds, images)
+            VALUES (coalesce(NEW.collection_id, -1), NEW.actual_seconds, 1)
+            ON CONFLICT (collection_id) DO UPDATE SET
+                seconds = seconds + excluded.seconds, images = images + 1;
+
+            INSERT INTO practice_image_totals (image_id, seconds, shown, last_shown)
+            SELECT NEW.image_id, NEW.actual_seconds, 1, NEW.ended_at WHERE NEW.image_id IS NOT NULL
+            ON CONFLICT (image_id) DO UPDATE SET
+                seconds = seconds + excluded.seconds, shown = shown + 1,
+                last_shown = max(last_shown, excluded.last_shown);
+        END
+    ''')
+
+    # Fold in anything logged before the rollups existed
+    cursor.execute('''
+        INSERT INTO practice_daily (day, seconds, images)
+        SELECT date(ended_at, 'unixepoch', 'localtime'), sum(actual_seconds), count(*)
+        FROM practice_log GROUP BY 1
+    ''')
+    cursor.execute('''
+        INSERT INTO practice_collection_totals (collection_id, seconds, images)
+        SELECT coalesce(collection_id, -1), sum(actual_seconds), count(*)
+        FROM practice_log GROUP BY 1
+    ''')
+    cursor.execute('''
+        INSERT INTO practice_image_totals (image_id, seconds, shown, last_shown)
+        SELECT image_id, sum(actual_seconds), count(*), max(ended_at)
+        FROM practice_log WHERE image_id IS NOT NULL GROUP BY image_id
+    ''')
+
+
+def _migration_content_hash(cursor):
+    # Hash of the file contents (see utils.content_hash), so the same image
+    # can't be in the library twice under different paths. NULL until hashed;
+    # NULLs don't collide in a unique index.
+    cursor.execute("ALTER TABLE images ADD COLUMN content_hash TEXT")
+    cursor.execute("CREATE UNIQUE INDEX idx_images_content_hash ON images (content_hash)")
+
+
+def _migration_perceptual_hash(cursor):
+    # 64-bit dHash (see utils.perceptual_hash), stored signed. Near-duplicate
+    # search runs on an in-memory index, so only the NULLs still to be
+    # hashed need an index here.
+    cursor.execute("ALTER TABLE images ADD COLUMN perceptual_hash INTEGER")
+    cursor.execute("CREATE INDEX idx_images_perceptual_pending ON images (id) WHERE perceptual_hash IS NULL")
+
+
+def _migration_image_meta(cursor):
+    # Header facts per image, filled by utils.image_meta's background scanner.
+    # width/height are as displayed (EXIF rotation applied) and NULL if the
+    # file couldn't be read; mtime/file_size tell the scanner what changed.
+    cursor.execute('''
+        CREATE TABLE image_meta (
+            image_id INTEGER PRIMARY KEY REFERENCES images(id) ON DELETE CASCADE,
+            width INTEGER,
+            height INTEGER,
+            format TEXT,
+            file_size INTEGER,
+            mtime REAL,
+            scanned_at REAL NOT NULL
+        )
+    ''')
+    # Serve filters like "portrait only", "min 2000px" and "larger than 10MB";
+    # queries must use these exact expressions (see utils.image_meta)
+    cursor.execute("CREATE INDEX idx_image_meta_portrait ON image_meta (image_id) WHERE height > width")
+    cursor.execute("CREATE INDEX idx_image_meta_landscape ON image_meta (image_id) WHERE width > height")
+    cursor.execute("CREATE INDEX idx_image_meta_short_edge ON image_meta (min(width, height))")
+    cursor.execute("CREATE INDEX idx_image_meta_file_size ON image_meta (file_size)")
+
+
+def _migration_collection_order(cursor):
+    # Collections are listed and played in link order (collection_images.id).
+    # The (collection_id, image_id) unique index can't serve that, so every
+    # keyset page sorted the whole collection; this one is a covering range scan.
+    cursor.execute("CREATE INDEX idx_collection_images_order ON collection_images (collection_id, id, image_id)")
+
+
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_collection_links,
+    _migration_session_plans,
+    _migration_recent_images,
+    _migration_practice_log,
+    _migration_practice_rollups,
+    _migration_content_hash,
+    _migration_perceptual_hash,
+    _migration_image_meta,
+    _migration_collection_order,
+]
+
+
+def migrate(conn):
+    """Upgrade the database schema in place to the latest version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return
+
+    # Table rebuilds need foreign key enforcement off; it can't change inside a transaction
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {number}")
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+# Initialize database
+def init_db():
+    migrate(get_connection())
@@ -1,8 +1,10 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLineEdit, QMessageBox, QHBoxLayout, QDialog, QLabel, QSplitter
+    QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QListView, QPushButton, QLineEdit, QMessageBox, QHBoxLayout, QDialog, QLabel, QSplitter
 )
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from storage import fetch_all, execute, execute_many, transaction
+from utils.pixmap_cache import get_pixmap_cache
+from ui.image_list_model import ImageListModel, sql_page_source, list_page_source, IMAGE_ID_ROLE, ROW_KEY_ROLE, PATH_ROLE
 import sqlite3
 
 class CollectionsWindow(QWidget):
@@ -24,7 +26,7 @@ class CollectionsWindow(QWidget):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -32,10 +34,10 @@ class CollectionsWindow(QWidget):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -85,8 +87,11 @@ class CollectionsWindow(QWidget):
         self.collection_images_label = QLabel("Images in Collection")
         left_layout.addWidget(self.collection_images_label)
 
-        self.collection_images_list = QListWidget()
-        self.collection_images_list.itemClicked.connect(self.on_collection_image_selected)
+        self.collection_images_list = QListView()
+        self.collection_images_list.setUniformItemSizes(True)
+        self.collection_images_model = ImageListModel(list_page_source([]), parent=self)
+        self.collection_images_list.setModel(self.collection_images_model)
+        self.collection_images_list.clicked.connect(self.on_collection_image_selected)
         left_layout.addWidget(self.collection_images_list)
 
         # Button to delete selected image from collection
@@ -123,11 +128,7 @@ class CollectionsWindow(QWidget):
     def load_collections(self):
         """Load all collections from the database."""
         self.collection_list.clear()
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM collections")
-        collections = cursor.fetchall()
-        conn.close()
+        collections = fetch_all("SELECT id, name FROM collections")
         for collection_id, name in collections:
             item = QListWidgetItem(name)
             item.setData(Qt.ItemDataRole.UserRole, collection_id)  # Store collection ID in the item
@@ -136,35 +137,23 @@ class CollectionsWindow(QWidget):
     def on_collection_selected(self, item):
         """Load images for the selected collection."""
         collection_id = item.data(Qt.ItemDataRole.UserRole)
-        self.collection_images_list.clear()
         self.collection_preview_label.clear()
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("""
+        # Rows carry the collection_images row ID as their key
+        self.collection_images_model.set_page_source(sql_page_source("""
             SELECT collection_images.id, images.id, images.path 
             FROM images 
             JOIN collection_images ON images.id = collection_images.image_id 
-            WHERE collection_images.collection_id = ?
-        """, (collection_id,))
-        images = cursor.fetchall()
-        conn.close()
+            WHERE collection_images.collection_id = ? AND collection_images.id > ?
+            ORDER BY collection_images.id
+            LIMIT ?
+        """, (collection_id,)))
 
-        for row_id, image_id, path in images:
-            item = QListWidgetItem(f"{image_id}: {path}")
-            item.setData(Qt.ItemDataRole.UserRole, row_id)  # Store the collection_images row ID
-            self.collection_images_list.addItem(item)
-
-    def on_collection_image_selected(self, item):
+    def on_collection_image_selected(self, index):
         """Show a preview of the selected image in the collection."""
-        image_path = item.text().split(": ")[1]
-        pixmap = QPixmap(image_path)
+        image_path = index.data(PATH_ROLE)
+        pixmap = get_pixmap_cache().get(image_path, 400, index.data(IMAGE_ID_ROLE))
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(
-                self.collection_preview_label.size(),
-                aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                transformMode=Qt.TransformationMode.SmoothTransformation
-            )
-            self.collection_preview_label.setPixmap(scaled_pixmap)
+            self.collection_preview_label.setPixmap(pixmap)
         else:
             self.collection_preview_label.setText("Failed to load image.")
 
@@ -172,16 +161,12 @@ class CollectionsWindow(QWidget):
         """Add a new collection to the database."""
         name = self.new_collection_name.text().strip()
         if name:
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
             try:
-                cursor.execute("INSERT INTO collections (name) VALUES (?)", (name,))
-                conn.commit()
+                execute("INSERT INTO collections (name) VALUES (?)", (name,))
                 self.new_collection_name.clear()
                 self.load_collections()
             except sqlite3.IntegrityError:
                 QMessageBox.warning(self, "Error", "Collection name already exists.")
-            conn.close()
 
     def delete_collection(self):
         """Delete the selected collection and all its associated images."""
@@ -199,30 +184,23 @@ class CollectionsWindow(QWidget):
         )
         if confirm == QMessageBox.StandardButton.Yes:
             self.collection_preview_label.clear()
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM collection_images WHERE collection_id = ?", (collection_id,))
-            cursor.execute("DELETE FROM collections WHERE id = ?", (collection_id,))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute("DELETE FROM collection_images WHERE collection_id = ?", (collection_id,))
+                conn.execute("DELETE FROM collections WHERE id = ?", (collection_id,))
             self.load_collections()
-            self.collection_images_list.clear()
+            self.collection_images_model.set_page_source(list_page_source([]))
 
     def delete_image_from_collection(self):
         self.collection_preview_label.clear()
         """Delete the selected image from the collection."""
-        selected_image = self.collection_images_list.currentItem()
-        if not selected_image:
+        selected_image = self.collection_images_list.currentIndex()
+        if not selected_image.isValid():
             QMessageBox.warning(self, "Error", "Please select an image to delete.")
             return
 
-        row_id = selected_image.data(Qt.ItemDataRole.UserRole)  # Get the collection_images row ID
+        row_id = selected_image.data(ROW_KEY_ROLE)  # Get the collection_images row ID
 
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM collection_images WHERE id = ?", (row_id,))
-        conn.commit()
-        conn.close()
+        execute("DELETE FROM collection_images WHERE id = ?", (row_id,))
 
         # Refresh the images list
         selected_collection = self.collection_list.currentItem()
@@ -251,20 +229,15 @@ class CollectionsWindow(QWidget):
         left_panel = QWidget()
         left_layout = QVBoxLayout()
 
-        self.dialog_image_list = QListWidget()
-        self.dialog_image_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)  # Enable multi-selection
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, path FROM images")
-        images = cursor.fetchall()
-        conn.close()
-
-        for image_id, path in images:
-            item = QListWidgetItem(f"{image_id}: {path}")
-            item.setData(Qt.ItemDataRole.UserRole, image_id)  # Store image ID in the item
-            self.dialog_image_list.addItem(item)
+        self.dialog_image_list = QListView()
+        self.dialog_image_list.setSelectionMode(QListView.SelectionMode.MultiSelection)  # Enable multi-selection
+        self.dialog_image_list.setUniformItemSizes(True)
+        self.dialog_image_list.setModel(ImageListModel(
+            sql_page_source("SELECT id, id, path FROM images WHERE id > ? ORDER BY id LIMIT ?"),
+            parent=dialog
+        ))
 
-        self.dialog_image_list.itemClicked.connect(lambda item: self.on_dialog_image_selected(item, dialog_preview_label))
+        self.dialog_image_list.clicked.connect(lambda index: self.on_dialog_image_selected(index, dialog_preview_label))
         left_layout.addWidget(self.dialog_image_list)
 
         left_panel.setLayout(left_layout)
@@ -292,34 +265,26 @@ class CollectionsWindow(QWidget):
 
         dialog.exec()
 
-    def on_dialog_image_selected(self, item, preview_label):
+    def on_dialog_image_selected(self, index, preview_label):
         """Show a preview of the selected image in the dialog."""
-        image_path = item.text().split(": ")[1]
-        pixmap = QPixmap(image_path)
+        image_path = index.data(PATH_ROLE)
+        pixmap = get_pixmap_cache().get(image_path, 400, index.data(IMAGE_ID_ROLE))
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(
-                preview_label.size(),
-                aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                transformMode=Qt.TransformationMode.SmoothTransformation
-            )
-            preview_label.setPixmap(scaled_pixmap)
+            preview_label.setPixmap(pixmap)
         else:
             preview_label.setText("Failed to load image.")
 
     def add_selected_images_to_collection(self, collection_id, image_list, dialog):
         """Add selected images to the collection."""
-        selected_items = image_list.selectedItems()
+        selected_items = image_list.selectionModel().selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Error", "Please select at least one image.")
             return
 
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        for item in selected_items:
-            image_id = item.data(Qt.ItemDataRole.UserRole)
-            cursor.execute("INSERT INTO collection_images (collection_id, image_id) VALUES (?, ?)", (collection_id, image_id))
-        conn.commit()
-        conn.close()
+        execute_many(
+            "INSERT OR IGNORE INTO collection_images (collection_id, image_id) VALUES (?, ?)",
+            [(collection_id, index.data(IMAGE_ID_ROLE)) for index in selected_items]
+        )
 
         dialog.close()
         self.on_collection_selected(self.collection_list.currentItem())  # Refresh the images list
\ No newline at end of file
@@ -1,13 +1,21 @@
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, QSpinBox, QCheckBox, QLabel, QMessageBox, QHBoxLayout, QWidget, QSizePolicy
+    QDialog, QVBoxLayout, QListWidget, QListWidgetItem, QListView, QPushButton, QSpinBox, QCheckBox, QLabel, QMessageBox, QHBoxLayout, QWidget
 )
-from PyQt6.QtCore import Qt, QTimer, QSize, QUrl
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtGui import QPixmap, QIcon, QPainter, QColor, QKeyEvent, QResizeEvent
-import sqlite3
-import random
+from PyQt6.QtCore import Qt, QTimer, QSize
+from PyQt6.QtGui import QPixmap, QColor, QKeyEvent, QResizeEvent
+from storage import fetch_all
+from utils.image_sampling import sample_image_ids, DEFAULT_SAMPLE_SIZE
+from utils.playlist import Playlist
+from utils.pixmap_cache import get_pixmap_cache
+from ui.image_canvas import ImageCanvas, ZOOM_STEP, PAN_STEP
+from ui.image_list_model import ImageListModel, playlist_page_source, PATH_ROLE
+from utils.image_decode import read_image, source_size, covers, display_decode_size
+from utils.image_prefetcher import ImagePrefetcher, PREFETCH_AHEAD
+from utils.sound_cues import get_sound_cues, CUE_TRANSITION
+from utils.shuffle_scheduler import ShownHistory, recent_positions
+from utils.practice_log import PracticeRecorder, MODE_FIXED
+from utils.playback_engine import PlaybackEngine, fixed_plan, SLOT_CHANGED
 import typing
-import os
 
 class FixedTimeModeWindow(QDialog):
     def __init__(self, parent=None):
@@ -28,7 +36,7 @@ class FixedTimeModeWindow(QDialog):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -36,10 +44,10 @@ class FixedTimeModeWindow(QDialog):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -61,6 +69,8 @@ class FixedTimeModeWindow(QDialog):
             }
         """)
         self.setup_ui()
+        # Decode sound cues while the user sets up, so the first one plays without delay
+        QTimer.singleShot(0, get_sound_cues)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -88,6 +98,17 @@ class FixedTimeModeWindow(QDialog):
         layout.addWidget(QLabel("Select Collection:"))
         layout.addWidget(self.collection_list)
 
+        # Random sample: draw images inside SQLite instead of loading the whole collection
+        sample_layout = QHBoxLayout()
+        self.sample_checkbox = QCheckBox("Random sample of")
+        sample_layout.addWidget(self.sample_checkbox)
+        self.sample_size_input = QSpinBox()
+        self.sample_size_input.setRange(1, 100000)
+        self.sample_size_input.setValue(DEFAULT_SAMPLE_SIZE)
+        sample_layout.addWidget(self.sample_size_input)
+        sample_layout.addWidget(QLabel("images"))
+        layout.addLayout(sample_layout)
+
         # Start button
         btn_start = QPushButton("Start")
         btn_start.clicked.connect(self.start_fixed_time_mode)
@@ -105,11 +126,7 @@ class FixedTimeModeWindow(QDialog):
         self.collection_list.addItem(all_collection_item)
 
         # Load collections from the database
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM collections")
-        collections = cursor.fetchall()
-        conn.close()
+        collections = fetch_all("SELECT id, name FROM collections")
 
         # Add collections from the database
         for collection_id, name in collections:
@@ -128,38 +145,36 @@ class FixedTimeModeWindow(QDialog):
         minutes = self.minutes_input.value()
         seconds = self.seconds_input.value()
         timer_duration = (minutes * 60 + seconds) * 1000
+        if timer_duration < 1000:
+            QMessageBox.warning(self, "Error", "Please set a duration of at least 1 second.")
+            return
 
-        # Fetch images based on the selected collection
-        if selected_collection.data(Qt.ItemDataRole.UserRole) == -1:
-            # "All" collection: Fetch all images from the database
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("SELECT path FROM images")
-            images = [row[0] for row in cursor.fetchall()]  # Get all image paths
-            conn.close()
-        else:
-            # Regular collection: Fetch images for the selected collection
+        # A random sample skips loading every path and the ordering step;
+        # paths are only looked up as playback reaches them
+        if self.sample_checkbox.isChecked():
             collection_id = selected_collection.data(Qt.ItemDataRole.UserRole)
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT images.path 
-                FROM images 
-                JOIN collection_images ON images.id = collection_images.image_id 
-                WHERE collection_images.collection_id = ?
-            """, (collection_id,))
-            images = [row[0] for row in cursor.fetchall()]  # Get image paths for the collection
-            conn.close()
+            image_ids = sample_image_ids(self.sample_size_input.value(), None if collection_id == -1 else collection_id)
+            if not image_ids:
+                QMessageBox.warning(self, "Error", "There are no images to play.")
+                return
+            self.image_player = ImagePlayerWindow(Playlist(image_ids, collection_id), timer_duration, True)
+            self.image_player.show()
+            self.close()
+            return
+
+        # Only image ids are loaded here; paths are looked up as rows and images are shown
+        collection_id = selected_collection.data(Qt.ItemDataRole.UserRole)
+        playlist = Playlist.from_collection(collection_id)
 
         # Open the image ordering window
-        self.image_ordering_window = ImageOrderingWindow(images, timer_duration)
+        self.image_ordering_window = ImageOrderingWindow(playlist, timer_duration)
         self.image_ordering_window.show()
         self.close()
 
 class ImageOrderingWindow(QDialog):
-    def __init__(self, images, timer_duration, parent=None):
+    def __init__(self, playlist, timer_duration, parent=None):
         super().__init__(parent)
-        self.images = images  # List of image paths
+        self.playlist = playlist  # Image ids in their starting order (utils.playlist.Playlist)
         self.timer_duration = timer_duration
         self.setWindowTitle("Customize Image Order")
         self.setGeometry(250, 250, 800, 600)
@@ -177,7 +192,7 @@ class ImageOrderingWindow(QDialog):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -185,10 +200,10 @@ class ImageOrderingWindow(QDialog):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -208,9 +223,11 @@ class ImageOrderingWindow(QDialog):
         layout = QHBoxLayout()
 
         # Left panel: List of images with drag-and-drop reordering
-        self.image_list = QListWidget()
-        self.image_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)  # Enable drag-and-drop reordering
+        self.image_list = QListView()
+        self.image_list.setDragDropMode(QListView.DragDropMode.InternalMove)  # Enable drag-and-drop reordering
+        self.image_list.setDefaultDropAction(Qt.DropAction.MoveAction)
         self.image_list.setIconSize(QSize(100, 100))  # Set thumbnail size
+        self.image_list.setUniformItemSizes(True)
         layout.addWidget(self.image_list)
 
         # Right panel: Image preview and shuffle toggle
@@ -238,77 +255,63 @@ class ImageOrderingWindow(QDialog):
         self.setLayout(layout)
 
     def load_images(self):
-            """Load images from the provided list of paths."""
-            for image_path in self.images:
-                item = QListWidgetItem()
-                item.setText(image_path)
-
-                # Create a white background for the thumbnail
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    # Create a white background image
-                    background = QPixmap(100, 100)
-                    background.fill(QColor("white"))
-                    painter = QPainter(background)
-                    scaled_pixmap = pixmap.scaled(100, 100, aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio)
-                    painter.drawPixmap(
-                        (background.width() - scaled_pixmap.width()) // 2,
-                        (background.height() - scaled_pixmap.height()) // 2,
-                        scaled_pixmap
-                    )
-                    painter.end()
-                    item.setIcon(QIcon(background))
-
-                self.image_list.addItem(item)
-
-            # Connect item selection to preview
-            self.image_list.itemClicked.connect(self.on_image_selected)
-
-    def on_image_selected(self, item):
+        """Load images from the playlist."""
+        # Rows and thumbnails are loaded lazily; only rows on screen request an icon
+        self.image_model = ImageListModel(
+            playlist_page_source(self.playlist),
+            icon_size=100,
+            icon_background=QColor("white"),
+            show_ids=False,
+            movable=True,
+            parent=self
+        )
+        self.image_list.setModel(self.image_model)
+
+        # Connect item selection to preview
+        self.image_list.clicked.connect(self.on_image_selected)
+
+    def closeEvent(self, a0):
+        self.image_model.cancel_thumbnails()
+        super().closeEvent(a0)
+
+    def on_image_selected(self, index):
         """Show a preview of the selected image."""
-        image_path = item.text()
-        pixmap = QPixmap(image_path)
+        image_path = index.data(PATH_ROLE)
+        pixmap = get_pixmap_cache().get(image_path, 400)
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(
-                self.preview_label.size(),
-                aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                transformMode=Qt.TransformationMode.SmoothTransformation
-            )
-            self.preview_label.setPixmap(scaled_pixmap)
+            self.preview_label.setPixmap(pixmap)
         else:
             self.preview_label.setText("Failed to load image.")
 
     def toggle_shuffle_mode(self):
         """Enable or disable drag-and-drop based on shuffle mode."""
         if self.shuffle_checkbox.isChecked():
-            self.image_list.setDragDropMode(QListWidget.DragDropMode.NoDragDrop)
+            self.image_list.setDragDropMode(QListView.DragDropMode.NoDragDrop)
             self.image_list.setStyleSheet("background-color: #3B4252;")  # Visual indicator for shuffle mode
         else:
-            self.image_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+            self.image_list.setDragDropMode(QListView.DragDropMode.InternalMove)
             self.image_list.setStyleSheet("")  # Reset style
 
     def start_fixed_time_mode(self):
         """Start the fixed-time mode with the customized order."""
-        # Get the ordered image paths
-        ordered_images = []
-        for index in range(self.image_list.count()):
-            item = self.image_list.item(index)
-            if item is not None:
-                ordered_images.append(item.text())
+        # Hand the same playlist over unless rows were dragged into a new order
+        playlist = self.playlist
+        if self.image_model.reordered:
+            playlist = self.playlist.reordered(self.image_model.all_image_ids())
+        if not playlist:
+            QMessageBox.warning(self, "Error", "There are no images to play.")
+            return
 
         # Open the image player window
-        self.image_player = ImagePlayerWindow(ordered_images, self.timer_duration, self.shuffle_checkbox.isChecked())
+        self.image_player = ImagePlayerWindow(playlist, self.timer_duration, self.shuffle_checkbox.isChecked())
         self.image_player.show()
         self.close()
         
 class ImagePlayerWindow(QWidget):
-    def __init__(self, images, timer_duration, shuffle_mode, parent=None):
+    def __init__(self, playlist, timer_duration, shuffle_mode, parent=None):
         super().__init__(parent)
-        self.images = images
         self.timer_duration = timer_duration
         self.shuffle_mode = shuffle_mode
-        self.current_index = 0
-        self.remaining_time = timer_duration // 1000  # Convert to seconds
         self.timer_running = False
         self.is_fullscreen = False  # Track fullscreen state
         self.setWindowTitle("Fixed-Time Mode - Image Player")
@@ -334,53 +337,46 @@ class ImagePlayerWindow(QWidget):
         """)
         self.setup_ui()
 
-        # Initialize the media player for sound cues
-        self.media_player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self.audio_output)
-
-        # Set volume to 50% (adjust as needed)
-        self.audio_output.setVolume(0.5)
-
-        # Load the sound file
-        sound_file_path = os.path.abspath("src/assets/kahootSound.mp3")
-        self.media_player.setSource(QUrl.fromLocalFile(sound_file_path))
-
-        # Connect to the errorOccurred signal for debugging
-        self.media_player.errorOccurred.connect(self.handle_media_error)
-        
-        # Shuffle the images if shuffle mode is enabled
-        if self.shuffle_mode:
-            random.shuffle(self.images)
+        # Index, shuffle and countdown live in the engine; this window only renders it.
+        # The countdown is deadline-based and the timer only wakes us on display second boundaries.
+        # Shuffled sessions start with images this collection hasn't shown for longest
+        history, recent = None, ()
+        if playlist.collection_id is not None:
+            history = ShownHistory(playlist.collection_id)
+            if self.shuffle_mode:
+                recent = recent_positions(playlist, playlist.collection_id)
+        self.engine = PlaybackEngine(playlist, fixed_plan(self.timer_duration // 1000), self.shuffle_mode, recent=recent, history=history)
+        self.engine.subscribe(self.on_playback_event)
+        self.practice_recorder = PracticeRecorder(self.engine, MODE_FIXED)  # Logged off the UI thread
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.update_timer)
+
+        # Sound cues are preloaded once for the whole app
+        self.sound_cues = get_sound_cues()
+
+        # Decode upcoming images in the background so transitions don't stall.
+        # Everything is decoded at roughly display size, not full resolution.
+        self.prefetcher = ImagePrefetcher(self.decode_target_size(), self)
+        self.current_image_path = None
+        self.current_decode_size = QSize()
+
+        # Re-decode at a higher resolution once the window stops growing
+        self.redecode_timer = QTimer(self)
+        self.redecode_timer.setSingleShot(True)
+        self.redecode_timer.setInterval(150)
+        self.redecode_timer.timeout.connect(self.redecode_current_image)
 
         # Display the first image immediately
         self.show_current_image()
 
-    def handle_media_error(self, error):
-        """Handle errors from the media player."""
-        error_message = self.media_player.errorString()
-        print(f"Media player error: {error_message}")
-        
-        
     def setup_ui(self):
         layout = QVBoxLayout()
 
         # Image display
-        self.image_label = QLabel("Image Preview")
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #4C566A;
-                border-radius: 10px;
-                background-color: #3B4252;
-            }
-        """)
-        
-        # Set QLabel size policy to prevent infinite window growth
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
-        self.image_label.setScaledContents(False)  # Don't allow QLabel to scale its content automatically
-
-        layout.addWidget(self.image_label, stretch=1)  # Allow the image label to expand
+        self.image_canvas = ImageCanvas("Image Preview")  # Paints from a cached scaled frame
+        layout.addWidget(self.image_canvas, stretch=1)  # Allow the image canvas to expand
 
         # Timer display
         self.timer_label = QLabel("00:00")
@@ -517,9 +513,7 @@ class ImagePlayerWindow(QWidget):
         """Start the timer to display images."""
         if not self.timer_running:
             self.timer_running = True
-            self.timer = QTimer()
-            self.timer.timeout.connect(self.update_timer)
-            self.timer.start(1000)  # Update every second
+            self.engine.start()
 
             # Hide the Start button and show the other buttons
             self.btn_start.hide()
@@ -542,8 +536,9 @@ class ImagePlayerWindow(QWidget):
         """Stop the timer."""
         if self.timer_running:
             self.timer_running = False
+            self.engine.pause()
             self.timer.stop()
-            self.media_player.stop()
+            self.sound_cues.stop()
 
             # Show the Start button and hide the other buttons
             self.btn_start.show()
@@ -564,92 +559,110 @@ class ImagePlayerWindow(QWidget):
 
     def reset_timer(self):
         """Reset the timer to its initial duration."""
-        self.remaining_time = self.timer_duration // 1000  # Reset to initial time
-        minutes = self.remaining_time // 60
-        seconds = self.remaining_time % 60
-        self.timer_label.setText(f"{minutes:02}:{seconds:02}")  # Update the timer display
+        self.engine.reset_countdown()  # Reset to initial time
 
     def skip_image(self):
         """Skip to the next image."""
-        self.show_next_image()
+        self.engine.next()
 
     def previous_image(self):
         """Go back to the previous image."""
-        if self.current_index > 0:
-            self.current_index -= 1
-            self.show_current_image()
-            self.remaining_time = self.timer_duration // 1000  # Reset timer
+        self.engine.previous()
         self.update_back_button_state()
 
     def end_practice(self):
         """End the practice session."""
-        self.media_player.stop()
+        self.sound_cues.stop()
+        self.prefetcher.clear()
         self.stop_timer()
         self.close()
 
+    def closeEvent(self, a0):
+        # Stop first: closing publishes an event, which would otherwise re-arm the timer
+        self.stop_timer()
+        self.engine.close()  # Remember what was shown for the next shuffled session
+        super().closeEvent(a0)
+
     def update_timer(self):
-        """Update the countdown timer."""
-        if self.remaining_time > 0:
-            self.remaining_time -= 1
-            minutes = self.remaining_time // 60
-            seconds = self.remaining_time % 60
-            self.timer_label.setText(f"{minutes:02}:{seconds:02}")
-            
-            # Play a sound cue if the timer is under 10 seconds
-            if self.remaining_time <= 10:
-                self.media_player.play()
-            else:
-                self.media_player.stop()
-        else:
-            self.show_next_image()
-            self.remaining_time = self.timer_duration // 1000  # Reset timer
+        """Update the countdown timer on a second boundary, moving on when the deadline passes."""
+        if self.engine.tick():
+            return  # Moved on; on_playback_event restarted the display and rescheduled
+
+        self.update_timer_display()
+
+        # Play the countdown cue through the last seconds
+        self.sound_cues.update_countdown(self.engine.countdown.remaining_seconds())
+        self.schedule_tick()
+
+    def update_timer_display(self):
+        """Update the timer display."""
+        remaining = self.engine.countdown.remaining_seconds()
+        minutes = remaining // 60
+        seconds = remaining % 60
+        self.timer_label.setText(f"{minutes:02}:{seconds:02}")
+
+    def schedule_tick(self):
+        """Arm the timer for the moment the displayed seconds next change."""
+        if self.timer_running:
+            self.timer.start(self.engine.countdown.ms_until_next_second())
+
+    def on_playback_event(self, event, engine):
+        """Re-render after the engine changes image or restarts the countdown."""
+        if event == SLOT_CHANGED:
+            self.sound_cues.play(CUE_TRANSITION)  # Cue first so the sound lands with the new image
+            self.show_current_image()
+        if engine.running:
+            self.sound_cues.update_countdown(engine.countdown.remaining_seconds())
+        self.update_timer_display()
+        self.schedule_tick()
 
     def show_current_image(self):
         """Display the current image in the collection."""
-        image_path = self.images[self.current_index]
-        pixmap = QPixmap(image_path)
-        if not pixmap.isNull():
-            self.current_pixmap = pixmap  # Store the original pixmap
-            self.update_image_size()
+        image_path = self.engine.current_image_path()
+        image = self.prefetcher.take(image_path)
+        if image is None:
+            image = read_image(image_path, self.prefetcher.target_size)  # Not prefetched yet, decode now
+        self.current_image_path = image_path
+        self.current_decode_size = self.prefetcher.target_size
+        if not image.isNull():
+            self.image_canvas.set_pixmap(QPixmap.fromImage(image), image_path)  # Decoded at roughly display size
         else:
-            self.image_label.setText("Failed to load image.")
+            self.image_canvas.set_text("Failed to load image.")
         self.update_back_button_state()
+        self.prefetch_upcoming_images()
 
-    def update_image_size(self):
-        """Update image size dynamically without resizing QLabel."""
-        if hasattr(self, "current_pixmap") and not self.current_pixmap.isNull():
-            scaled_pixmap = self.current_pixmap.scaled(
-                self.image_label.width(), 
-                self.image_label.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
+    def prefetch_upcoming_images(self):
+        """Queue background decodes for the next images and the previous one (for Back)."""
+        self.prefetcher.prefetch(self.engine.prefetch_paths(PREFETCH_AHEAD))
 
     def resizeEvent(self, a0: typing.Optional[QResizeEvent]):
-        """Prevent QLabel from causing infinite window growth."""
-        if hasattr(self, "current_pixmap") and not self.current_pixmap.isNull():
-            self.update_image_size()
+        """The canvas rescales itself; re-decode once the window stops changing size."""
+        if hasattr(self, "redecode_timer"):
+            self.redecode_timer.start()
         super().resizeEvent(a0)
 
-    def show_next_image(self):
-        """Display the next image in the collection."""
-        if self.current_index >= len(self.images) - 1:
-            self.current_index = 0  # Restart from the beginning
-            if self.shuffle_mode:
-                random.shuffle(self.images)  # Reshuffle if shuffle mode is enabled
-        else:
-            self.current_index += 1
-
-        self.show_current_image()
-        self.remaining_time = self.timer_duration // 1000  # Reset timer
+    def decode_target_size(self):
+        """Return the pixel size images should be decoded to for the current window."""
+        widget = self.image_canvas if self.isVisible() else self
+        return display_decode_size(widget)
+
+    def redecode_current_image(self):
+        """Decode the current image again if the display outgrew the resolution it was decoded at."""
+        target = self.decode_target_size()
+        self.prefetcher.set_target_size(target)
+        if self.current_image_path is not None and not covers(self.current_decode_size, target):
+            full_size = source_size(self.current_image_path)
+            # Only worth it if the first decode was downscaled
+            if full_size.isValid() and not covers(self.image_canvas.pixmap().size(), full_size):
+                image = read_image(self.current_image_path, target)
+                if not image.isNull():
+                    self.image_canvas.set_pixmap(QPixmap.fromImage(image), self.current_image_path)
+            self.current_decode_size = target
+        self.prefetch_upcoming_images()
 
     def update_back_button_state(self):
         """Enable or disable the Back button based on the current image index."""
-        if self.current_index == 0:
-            self.btn_back.setEnabled(False)  # Disable if it's the first image
-        else:
-            self.btn_back.setEnabled(True)  # Enable otherwise
+        self.btn_back.setEnabled(self.engine.can_go_back())  # Disabled on the first image
 
     def toggle_fullscreen(self):
         """Toggle between fullscreen and normal mode."""
@@ -676,4 +689,18 @@ class ImagePlayerWindow(QWidget):
             elif a0.key() == Qt.Key.Key_E:  # End practice
                 self.end_practice()
             elif a0.key() == Qt.Key.Key_F11:  # Toggle fullscreen
-                self.toggle_fullscreen()
\ No newline at end of file
+                self.toggle_fullscreen()
+            elif a0.key() in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):  # Zoom in
+                self.image_canvas.zoom_by(ZOOM_STEP)
+            elif a0.key() == Qt.Key.Key_Minus:  # Zoom out
+                self.image_canvas.zoom_by(1 / ZOOM_STEP)
+            elif a0.key() == Qt.Key.Key_0:  # Fit the whole image again
+                self.image_canvas.reset_zoom()
+            elif a0.key() == Qt.Key.Key_Left:  # Pan while zoomed
+                self.image_canvas.pan_by(PAN_STEP, 0)
+            elif a0.key() == Qt.Key.Key_Right:
+                self.image_canvas.pan_by(-PAN_STEP, 0)
+            elif a0.key() == Qt.Key.Key_Up:
+                self.image_canvas.pan_by(0, PAN_STEP)
+            elif a0.key() == Qt.Key.Key_Down:
+                self.image_canvas.pan_by(0, -PAN_STEP)
\ No newline at end of file
@@ -0,0 +1,273 @@
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF, QSize, QSizeF
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QFont, QPen
+from utils.tile_pyramid import TileLoader
+
+# How long the size must stay put before the fast preview is replaced by a smooth frame
+RESIZE_SETTLE_MS = 120
+
+# Zoom factor per wheel notch or zoom key press
+ZOOM_STEP = 1.25
+
+# Deepest zoom, in screen pixels per source pixel
+MAX_PIXEL_ZOOM = 8.0
+
+# Distance the arrow keys pan, in screen pixels
+PAN_STEP = 100
+
+BORDER_WIDTH = 2
+BORDER_RADIUS = 10
+BORDER_COLOR = QColor("#4C566A")
+BACKGROUND_COLOR = QColor("#3B4252")
+TEXT_COLOR = QColor("#ECEFF4")
+
+
+class ImageCanvas(QWidget):
+    """Paints a pixmap fitted to the widget (keeping aspect ratio) from a cached scaled frame.
+
+    The smooth rescale of the source happens once per pixmap and size, at the
+    widget's device pixel ratio so HiDPI screens get full resolution. While
+    the widget is being resized the last frame is stretched with a fast
+    transform instead, and a smooth frame is rebuilt once the size settles.
+
+    Zooming past the fitted view (wheel, zoom keys in the players) and
+    panning (drag, arrow keys) work in full-resolution source coordinates.
+    When the pixmap isn't sharp enough for the zoom, tiles of the source
+    file at a matching pyramid level are drawn over it as they load.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self._pixmap = QPixmap()
+        self._text = text
+        self._font = QFont(self.font())
+        self._font.setPixelSize(16)
+        self._frame = QPixmap()  # Source scaled for the current size and device pixel ratio
+        self._frame_key = None
+        self._resizing = False
+        self._source_path = None
+        self._zoom = 1.0  # Relative to fitting the whole image
+        self._center = QPointF()  # Source point at the middle of the view while zoomed
+        self._drag_position = None
+
+        self.tiles = TileLoader(self)
+        self.tiles.tile_ready.connect(self.update)
+
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(RESIZE_SETTLE_MS)
+        self.settle_timer.timeout.connect(self.on_resize_settled)
+
+    def pixmap(self):
+        return self._pixmap
+
+    def set_pixmap(self, pixmap, source_path=None):
+        """Show `pixmap` (at any resolution; it's scaled to fit on paint).
+
+        `source_path` is the file the pixmap was decoded from, used for tiles
+        when zooming in. Showing a different file resets the zoom.
+        """
+        if source_path is None or source_path != self._source_path:
+            self.reset_zoom()
+        self._source_path = source_path
+        self._pixmap = pixmap
+        self._text = ""
+        self._frame, self._frame_key = QPixmap(), None
+        self.update()
+
+    def set_text(self, text, pixel_size=16, bold=False):
+        """Show a centered message instead of an image."""
+        self.reset_zoom()
+        self._source_path = None
+        self._pixmap = QPixmap()
+        self._frame, self._frame_key = QPixmap(), None
+        self._text = text
+        self._font.setPixelSize(pixel_size)
+        self._font.setBold(bold)
+        self.update()
+
+    def image_rect(self):
+        """Area images are fitted into, inside the border (logical pixels)."""
+        return QRectF(self.rect()).adjusted(BORDER_WIDTH, BORDER_WIDTH, -BORDER_WIDTH, -BORDER_WIDTH)
+
+    def fitted_rect(self):
+        """Where the pixmap lands: the image area shrunk to its aspect ratio and centered."""
+        area = self.image_rect()
+        size = self._pixmap.size().toSizeF().scaled(area.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        rect = QRectF(0, 0, size.width(), size.height())
+        rect.moveCenter(area.center())
+        return rect
+
+    def scaled_frame(self, target):
+        """Return the smoothly scaled frame for `target`, rebuilding it only when needed."""
+        ratio = self.devicePixelRatioF()
+        device_size = QSize(max(1, round(target.width() * ratio)), max(1, round(target.height() * ratio)))
+        key = (self._pixmap.cacheKey(), device_size, ratio)
+        if key != self._frame_key:
+            self._frame = self._pixmap.scaled(
+                device_size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            self._frame.setDevicePixelRatio(ratio)
+            self._frame_key = key
+        return self._frame
+
+    def source_size(self):
+        """Full-resolution size of what's shown (the pixmap's own size without a readable source)."""
+        image = self.tiles.image
+        if image is not None and image.is_valid():
+            return QSizeF(image.size)
+        return self._pixmap.size().toSizeF()
+
+    def fit_scale(self):
+        """Screen pixels per source pixel with the whole image fitted."""
+        size = self.source_size()
+        area = self.image_rect()
+        if size.isEmpty() or area.isEmpty():
+            return 1.0
+        return min(area.width() / size.width(), area.height() / size.height())
+
+    def is_zoomed(self):
+        return self._zoom > 1.0
+
+    def reset_zoom(self):
+        self._zoom = 1.0
+        self._drag_position = None
+        self.tiles.set_source(None)
+        self.unsetCursor()
+        self.update()
+
+    def zoom_by(self, factor, anchor=None):
+        """Zoom by `factor`, keeping the source point under `anchor` (widget coordinates) in place."""
+        if self._pixmap.isNull() or (factor <= 1.0 and not self.is_zoomed()):
+            return
+        if self._source_path is not None:
+            self.tiles.set_source(self._source_path)
+        area = self.image_rect()
+        fit = self.fit_scale()
+        if not self.is_zoomed():
+            size = self.source_size()
+            self._center = QPointF(size.width() / 2, size.height() / 2)
+        zoom = min(max(self._zoom * factor, 1.0), max(1.0, MAX_PIXEL_ZOOM / fit))
+        offset = (anchor if anchor is not None else area.center()) - area.center()
+        point = self._center + offset / (fit * self._zoom)
+        self._center = point - offset / (fit * zoom)
+        self._zoom = zoom
+        if self.is_zoomed():
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+        else:
+            self.reset_zoom()
+        self.clamp_center()
+        self.update()
+
+    def pan_by(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels."""
+        if not self.is_zoomed():
+            return
+        self._center -= QPointF(dx, dy) / (self.fit_scale() * self._zoom)
+        self.clamp_center()
+        self.update()
+
+    def clamp_center(self):
+        """Keep the view on the image; an axis that fits on screen stays centered."""
+        size = self.source_size()
+        area = self.image_rect()
+        scale = self.fit_scale() * self._zoom
+        x, y = self._center.x(), self._center.y()
+        half_width, half_height = area.width() / 2 / scale, area.height() / 2 / scale
+        if size.width() <= 2 * half_width:
+            x = size.width() / 2
+        else:
+            x = min(max(x, half_width), size.width() - half_width)
+        if size.height() <= 2 * half_height:
+            y = size.height() / 2
+        else:
+            y = min(max(y, half_height), size.height() - half_height)
+        self._center = QPointF(x, y)
+
+    def wheelEvent(self, a0):
+        steps = a0.angleDelta().y() / 120
+        if steps:
+            self.zoom_by(ZOOM_STEP ** steps, a0.position())
+        a0.accept()
+
+    def mousePressEvent(self, a0):
+        if self.is_zoomed() and a0.button() == Qt.MouseButton.LeftButton:
+            self._drag_position = a0.position()
+            self.setCursor(Qt.CursorShape.ClosedHandCursor)
+        super().mousePressEvent(a0)
+
+    def mouseMoveEvent(self, a0):
+        if self._drag_position is not None:
+            delta = a0.position() - self._drag_position
+            self._drag_position = a0.position()
+            self.pan_by(delta.x(), delta.y())
+        super().mouseMoveEvent(a0)
+
+    def mouseReleaseEvent(self, a0):
+        if self._drag_position is not None:
+            self._drag_position = None
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+        super().mouseReleaseEvent(a0)
+
+    def mouseDoubleClickEvent(self, a0):
+        self.reset_zoom()
+        super().mouseDoubleClickEvent(a0)
+
+    def resizeEvent(self, a0):
+        self._resizing = True
+        self.settle_timer.start()
+        if self.is_zoomed():
+            self.clamp_center()
+        super().resizeEvent(a0)
+
+    def on_resize_settled(self):
+        self._resizing = False
+        self.update()
+
+    def paintEvent(self, a0):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        half = BORDER_WIDTH / 2
+        painter.setPen(QPen(BORDER_COLOR, BORDER_WIDTH))
+        painter.setBrush(BACKGROUND_COLOR)
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(half, half, -half, -half), BORDER_RADIUS, BORDER_RADIUS)
+
+        if not self._pixmap.isNull() and self.is_zoomed():
+            self.paint_zoomed(painter)
+        elif not self._pixmap.isNull():
+            target = self.fitted_rect()
+            if self._resizing and not self._frame.isNull():
+                # Stretch the last frame with a fast transform; no new pixmap is allocated
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+                painter.drawPixmap(target, self._frame, QRectF(self._frame.rect()))
+            else:
+                painter.drawPixmap(target.topLeft(), self.scaled_frame(target))
+        elif self._text:
+            painter.setPen(TEXT_COLOR)
+            painter.setFont(self._font)
+            painter.drawText(self.image_rect(), Qt.AlignmentFlag.AlignCenter, self._text)
+        painter.end()
+
+    def paint_zoomed(self, painter):
+        area = self.image_rect()
+        size = self.source_size()
+        scale = self.fit_scale() * self._zoom
+        origin = area.center() - self._center * scale  # Where source (0, 0) lands
+        painter.setClipRect(area)
+
+        # The display-sized pixmap stretched underneath, until sharper tiles arrive
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, not self._resizing)
+        painter.drawPixmap(QRectF(origin, size * scale), self._pixmap, QRectF(self._pixmap.rect()))
+
+        image = self.tiles.image
+        device_scale = scale * self.devicePixelRatioF()
+        if image is None or not image.is_valid() or self._pixmap.width() >= size.width() * device_scale:
+            return  # The pixmap already has a pixel per device pixel
+        visible = QRectF(
+            self._center.x() - area.width() / 2 / scale, self._center.y() - area.height() / 2 / scale,
+            area.width() / scale, area.height() / scale,
+        )
+        for (level, col, row), tile in self.tiles.visible_tiles(image.level_for(device_scale), visible).items():
+            rect = QRectF(image.tile_rect(level, col, row))
+            painter.drawImage(QRectF(origin + rect.topLeft() * scale, rect.size() * scale), tile)
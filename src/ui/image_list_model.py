@@ -0,0 +1,252 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QMimeData, QByteArray
+from PyQt6.QtGui import QIcon, QImage, QPixmap, QColor
+from utils.thumbnail_cache import padded_thumbnail
+from utils.thumbnail_loader import ThumbnailLoader, PRIORITY_VISIBLE
+from storage import fetch_all
+from array import array
+from collections import OrderedDict
+import json
+
+# Extra roles exposed by ImageListModel
+IMAGE_ID_ROLE = Qt.ItemDataRole.UserRole
+ROW_KEY_ROLE = Qt.ItemDataRole.UserRole + 1  # Sort key of the row (e.g. collection_images.id)
+PATH_ROLE = Qt.ItemDataRole.UserRole + 2
+
+# Rows pulled from the source per fetchMore call
+PAGE_SIZE = 500
+
+# Decoded icons kept in memory per model; only rows that get painted ever need one
+ICON_CACHE_ROWS = 512
+
+ROWS_MIME_TYPE = "application/x-morpice-image-rows"
+
+
+def sql_page_source(sql, params=()):
+    """Page source for a keyset-paginated query.
+
+    The query must select (sort_key, image_id, path), filter on `sort_key > ?`
+    as its last placeholder, order by sort_key and end with `LIMIT ?`.
+    """
+    def fetch_page(after_key, limit):
+        return fetch_all(sql, (*params, after_key, limit))
+    return fetch_page
+
+
+def list_page_source(paths):
+    """Page source over an in-memory list of paths; the row key is the list index."""
+    def fetch_page(after_key, limit):
+        start = after_key + 1
+        return [(i, -1, paths[i]) for i in range(start, min(start + limit, len(paths)))]
+    return fetch_page
+
+
+def playlist_page_source(playlist):
+    """Page source over a utils.playlist.Playlist; the row key is the playlist position."""
+    def fetch_page(after_key, limit):
+        start = after_key + 1
+        stop = min(start + limit, len(playlist))
+        paths = playlist.paths(start, stop)
+        return [(i, playlist.image_id(i), paths[i - start]) for i in range(start, stop)]
+    return fetch_page
+
+
+class ImageListModel(QAbstractListModel):
+    """Lazily paged list of images for QListView.
+
+    Each row is a compact (key, image id, path) record. Rows are fetched a
+    page at a time as the view scrolls, and thumbnails are only requested
+    for rows the view actually paints.
+    """
+
+    def __init__(self, page_source, icon_size=None, icon_background=None, show_ids=True, movable=False, parent=None):
+        super().__init__(parent)
+        self.page_source = page_source
+        self.show_ids = show_ids
+        self.movable = movable
+        self._keys = array('q')
+        self._image_ids = array('q')
+        self._paths = []
+        self._last_key = -1  # Highest key fetched so far; rows may be reordered after loading
+        self._exhausted = False
+        self.reordered = False  # Set once rows are moved or removed
+
+        self.icon_size = icon_size
+        self._icons = OrderedDict()
+        self._failed = set()  # Paths that couldn't be decoded; not requested again until refresh()
+        self._loader = None
+        if icon_size is not None:
+            self._loader = ThumbnailLoader(icon_size, icon_background, self)
+            self._loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+            placeholder = padded_thumbnail(QImage(), icon_size, QColor("#4C566A"))
+            self._placeholder = QIcon(QPixmap.fromImage(placeholder))
+
+    # Paging
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._paths)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        rows = self.page_source(self._last_key, PAGE_SIZE)
+        if len(rows) < PAGE_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for key, image_id, path in rows:
+            self._keys.append(key)
+            self._image_ids.append(image_id)
+            self._paths.append(path)
+        self.endInsertRows()
+        self._last_key = rows[-1][0]
+
+    def fetch_all_remaining(self):
+        """Pull every page that hasn't been loaded yet."""
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def set_page_source(self, page_source):
+        """Point the model at a different source and reload from the top."""
+        self.page_source = page_source
+        self.refresh()
+
+    def refresh(self):
+        """Drop loaded rows and start paging again from the top."""
+        self.beginResetModel()
+        self._keys = array('q')
+        self._image_ids = array('q')
+        self._paths = []
+        self._last_key = -1
+        self._exhausted = False
+        self.reordered = False
+        self._failed.clear()
+        self.endResetModel()
+
+    def all_image_ids(self):
+        """Return every image id in the current row order, loading remaining pages first."""
+        self.fetch_all_remaining()
+        return array('I', self._image_ids)
+
+    # Data
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._paths):
+            return None
+        row = index.row()
+        path = self._paths[row]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{self._image_ids[row]}: {path}" if self.show_ids else path
+        if role == Qt.ItemDataRole.DecorationRole and self._loader is not None:
+            icon = self._icons.get(path)
+            if icon is not None:
+                self._icons.move_to_end(path)
+                return icon
+            if path in self._failed:
+                return self._placeholder
+            # Only painted rows ask for decoration, so this requests visible rows only
+            self._loader.request(path, path, PRIORITY_VISIBLE)
+            return self._placeholder
+        if role == IMAGE_ID_ROLE:
+            return self._image_ids[row]
+        if role == ROW_KEY_ROLE:
+            return self._keys[row]
+        if role == PATH_ROLE:
+            return path
+        return None
+
+    def _on_thumbnail_ready(self, path, image):
+        if image.isNull():
+            # Missing or unreadable file; the placeholder stays up and it isn't decoded on every repaint
+            self._failed.add(path)
+            return
+        self._icons[path] = QIcon(QPixmap.fromImage(image))
+        if len(self._icons) > ICON_CACHE_ROWS:
+            self._icons.popitem(last=False)
+        if self._paths:
+            # Views only repaint the rows they show, so a full-range signal is cheap
+            self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [Qt.ItemDataRole.DecorationRole])
+
+    def cancel_thumbnails(self):
+        if self._loader is not None:
+            self._loader.cancel_all()
+
+    # Drag-and-drop reordering
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.movable:
+            if index.isValid():
+                flags |= Qt.ItemFlag.ItemIsDragEnabled
+            else:
+                flags |= Qt.ItemFlag.ItemIsDropEnabled
+        return flags
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        mime = QMimeData()
+        records = [
+            (self._keys[i.row()], self._image_ids[i.row()], self._paths[i.row()])
+            for i in sorted(indexes, key=lambda i: i.row())
+        ]
+        mime.setData(ROWS_MIME_TYPE, QByteArray(json.dumps(records).encode()))
+        return mime
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action == Qt.DropAction.IgnoreAction:
+            return True
+        if not self.movable or not data.hasFormat(ROWS_MIME_TYPE):
+            return False
+        records = json.loads(bytes(data.data(ROWS_MIME_TYPE).data()).decode())
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._paths)
+        self.beginInsertRows(QModelIndex(), row, row + len(records) - 1)
+        for offset, (key, image_id, path) in enumerate(records):
+            self._keys.insert(row + offset, key)
+            self._image_ids.insert(row + offset, image_id)
+            self._paths.insert(row + offset, path)
+        self.endInsertRows()
+        self.reordered = True
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0 or row < 0 or row + count > len(self._paths):
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self._keys[row:row + count]
+        del self._image_ids[row:row + count]
+        del self._paths[row:row + count]
+        self.endRemoveRows()
+        self.reordered = True
+        return True
+
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_child):
+        if source_parent.isValid() or destination_parent.isValid():
+            return False
+        if source_row <= destination_child <= source_row + count:
+            return False  # Moving a block onto itself is a no-op Qt refuses anyway
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row + count - 1, QModelIndex(), destination_child):
+            return False
+        block = slice(source_row, source_row + count)
+        keys, image_ids, paths = self._keys[block], self._image_ids[block], self._paths[block]
+        del self._keys[block]
+        del self._image_ids[block]
+        del self._paths[block]
+        target = destination_child if destination_child < source_row else destination_child - count
+        self._keys[target:target] = keys
+        self._image_ids[target:target] = image_ids
+        self._paths[target:target] = paths
+        self.endMoveRows()
+        self.reordered = True
+        return True
@@ -1,8 +1,7 @@
 from PyQt6.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QWidget
-from ui.session_window import SessionModeWindow
-from ui.storage_window import StorageWindow
-from ui.collection_window import CollectionsWindow
-from ui.fixed_window import FixedTimeModeWindow
+
+# Window modules are imported by their button handlers: they pull in image
+# decoding, thumbnails and QtMultimedia, none of which the main menu needs.
 
 class ImageTimerApp(QMainWindow):
     def __init__(self):
@@ -71,28 +70,41 @@ class ImageTimerApp(QMainWindow):
         self.btn_session_mode = QPushButton("Session Mode")
         self.btn_session_mode.clicked.connect(self.on_session_button_clicked)
 
+        self.btn_statistics = QPushButton("Statistics")
+        self.btn_statistics.clicked.connect(self.on_statistics_button_clicked)
+
         layout.addWidget(self.btn_storage)
         layout.addWidget(self.btn_collections)
         layout.addWidget(self.btn_fixed_time)
         layout.addWidget(self.btn_session_mode)
+        layout.addWidget(self.btn_statistics)
         
         container = QWidget()
         container.setLayout(layout)
         self.setCentralWidget(container)
     
     def on_storage_button_clicked(self):
+        from ui.storage_window import StorageWindow
         self.storage_window = StorageWindow()
         self.storage_window.show()
         
     def on_collection_button_clicked(self):
+        from ui.collection_window import CollectionsWindow
         self.collections_window = CollectionsWindow()
         self.collections_window.show()
         
     def on_fixed_button_clicked(self):
         """Open the fixed-time mode configuration window."""
+        from ui.fixed_window import FixedTimeModeWindow
         self.fixed_time_window = FixedTimeModeWindow()
         self.fixed_time_window.show()
     
     def on_session_button_clicked(self):
+        from ui.session_window import SessionModeWindow
         self.session_window = SessionModeWindow()
-        self.session_window.show()
\ No newline at end of file
+        self.session_window.show()
+
+    def on_statistics_button_clicked(self):
+        from ui.statistics_window import StatisticsWindow
+        self.statistics_window = StatisticsWindow()
+        self.statistics_window.show()
\ No newline at end of file
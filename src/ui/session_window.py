@@ -1,15 +1,23 @@
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, QSpinBox, QCheckBox, QLabel, QMessageBox, QHBoxLayout, QWidget, QSizePolicy, QComboBox, QLineEdit
+    QDialog, QVBoxLayout, QListWidget, QListWidgetItem, QListView, QPushButton, QSpinBox, QCheckBox, QLabel, QMessageBox, QHBoxLayout, QWidget, QComboBox, QLineEdit
 )
-from PyQt6.QtCore import Qt, QTimer, QSize, QUrl
-from PyQt6.QtGui import QPixmap, QIcon, QPainter, QColor, QKeyEvent, QResizeEvent
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from utils.session_utils import parse_session_duration
-
-import sqlite3
-import random
+from PyQt6.QtCore import Qt, QTimer, QSize
+from PyQt6.QtGui import QPixmap, QColor, QKeyEvent, QResizeEvent
+from utils.session_utils import Segment, SessionPlan, SessionParseError, parse_session_plan, load_session_plans, save_session_plan
+
+from storage import fetch_all, fetch_one
+from utils.image_sampling import sample_image_ids, DEFAULT_SAMPLE_SIZE
+from utils.playlist import Playlist
+from utils.pixmap_cache import get_pixmap_cache
+from ui.image_canvas import ImageCanvas, ZOOM_STEP, PAN_STEP
+from ui.image_list_model import ImageListModel, playlist_page_source, PATH_ROLE
+from utils.image_decode import read_image, source_size, covers, display_decode_size
+from utils.image_prefetcher import ImagePrefetcher, PREFETCH_AHEAD
+from utils.sound_cues import get_sound_cues, CUE_TRANSITION, CUE_BREAK_START, CUE_BREAK_END
+from utils.shuffle_scheduler import ShownHistory, recent_positions
+from utils.practice_log import PracticeRecorder, MODE_SESSION
+from utils.playback_engine import PlaybackEngine, SLOT_CHANGED, SOFT_SKIPPED
 import typing
-import os
 
 class SessionModeWindow(QDialog):
     def __init__(self, parent=None):
@@ -30,7 +38,7 @@ class SessionModeWindow(QDialog):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -38,10 +46,10 @@ class SessionModeWindow(QDialog):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -79,6 +87,8 @@ class SessionModeWindow(QDialog):
             }
         """)
         self.setup_ui()
+        # Decode sound cues while the user sets up, so the first one plays without delay
+        QTimer.singleShot(0, get_sound_cues)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -89,6 +99,17 @@ class SessionModeWindow(QDialog):
         layout.addWidget(QLabel("Select Collection:"))
         layout.addWidget(self.collection_list)
 
+        # Random sample: draw images inside SQLite instead of loading the whole collection
+        sample_layout = QHBoxLayout()
+        self.sample_checkbox = QCheckBox("Random sample of")
+        sample_layout.addWidget(self.sample_checkbox)
+        self.sample_size_input = QSpinBox()
+        self.sample_size_input.setRange(1, 100000)
+        self.sample_size_input.setValue(DEFAULT_SAMPLE_SIZE)
+        sample_layout.addWidget(self.sample_size_input)
+        sample_layout.addWidget(QLabel("images"))
+        layout.addLayout(sample_layout)
+
         # Session duration selection
         self.session_duration_combo = QComboBox()
         self.load_session_durations()
@@ -123,11 +144,7 @@ class SessionModeWindow(QDialog):
         all_collection_item.setData(Qt.ItemDataRole.UserRole, -1)  # Use -1 as a special ID for "All"
         self.collection_list.addItem(all_collection_item)
         
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM collections")
-        collections = cursor.fetchall()
-        conn.close()
+        collections = fetch_all("SELECT id, name FROM collections")
         
         for collection_id, name in collections:
             item = QListWidgetItem(name)
@@ -142,36 +159,39 @@ class SessionModeWindow(QDialog):
 
         # Get the selected session duration
         session_duration = self.session_duration_combo.currentText()
+        plan = self.session_duration_combo.currentData()  # Compiled plan cached with saved sessions
         if session_duration == "Custom...":
             session_duration = self.custom_duration_input.text().strip()
             if not session_duration:
                 QMessageBox.warning(self, "Error", "Please enter a custom session duration.")
                 return
+            plan = None
+        if plan is None:
+            try:
+                plan = parse_session_plan(session_duration)
+            except SessionParseError as e:
+                QMessageBox.warning(self, "Error", f"Invalid session duration: {e}")
+                return
 
-        # Fetch images based on the selected collection
-        if selected_collection.data(Qt.ItemDataRole.UserRole) == -1:
-            # "All" collection: Fetch all images from the database
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("SELECT path FROM images")
-            images = [row[0] for row in cursor.fetchall()]  # Get all image paths
-            conn.close()
-        else:
-            # Regular collection: Fetch images for the selected collection
+        # A random sample skips loading every path and the ordering step;
+        # paths are only looked up as playback reaches them
+        if self.sample_checkbox.isChecked():
             collection_id = selected_collection.data(Qt.ItemDataRole.UserRole)
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT images.path 
-                FROM images 
-                JOIN collection_images ON images.id = collection_images.image_id 
-                WHERE collection_images.collection_id = ?
-            """, (collection_id,))
-            images = [row[0] for row in cursor.fetchall()]  # Get image paths for the collection
-            conn.close()
+            image_ids = sample_image_ids(self.sample_size_input.value(), None if collection_id == -1 else collection_id)
+            if not image_ids:
+                QMessageBox.warning(self, "Error", "There are no images to play.")
+                return
+            self.session_player = SessionPlayerWindow(Playlist(image_ids, collection_id), plan, True)
+            self.session_player.show()
+            self.close()
+            return
+
+        # Only image ids are loaded here; paths are looked up as rows and images are shown
+        collection_id = selected_collection.data(Qt.ItemDataRole.UserRole)
+        playlist = Playlist.from_collection(collection_id)
 
         # Open the session image ordering window
-        self.session_ordering_window = SessionImageOrderingWindow(images, session_duration)
+        self.session_ordering_window = SessionImageOrderingWindow(playlist, plan)
         self.session_ordering_window.show()
         self.close()
 
@@ -179,15 +199,9 @@ class SessionModeWindow(QDialog):
             """Load built-in and custom session durations from the database."""
             self.session_duration_combo.clear()
 
-            # Load custom sessions from the database
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("SELECT name, duration FROM sessions")
-            sessions = cursor.fetchall()
-            conn.close()
-
-            for name, duration in sessions:
-                self.session_duration_combo.addItem(f"{name}: {duration}")
+            # Load custom sessions (with their compiled plans) from the database
+            for name, duration, plan in load_session_plans():
+                self.session_duration_combo.addItem(f"{name}: {duration}", plan)
 
     def add_custom_session(self):
         """Open the custom session creation dialog."""
@@ -196,9 +210,9 @@ class SessionModeWindow(QDialog):
         self.load_session_durations()  # Refresh the session duration list
 
 class SessionImageOrderingWindow(QDialog):
-    def __init__(self, images, session_duration, parent=None):
+    def __init__(self, playlist, session_duration, parent=None):
         super().__init__(parent)
-        self.images = images  # List of image paths
+        self.playlist = playlist  # Image ids in their starting order (utils.playlist.Playlist)
         self.session_duration = session_duration
         self.setWindowTitle("Customize Image Order")
         self.setGeometry(250, 250, 800, 600)
@@ -216,7 +230,7 @@ class SessionImageOrderingWindow(QDialog):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -224,10 +238,10 @@ class SessionImageOrderingWindow(QDialog):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -247,9 +261,11 @@ class SessionImageOrderingWindow(QDialog):
         layout = QHBoxLayout()
 
         # Left panel: List of images with drag-and-drop reordering
-        self.image_list = QListWidget()
-        self.image_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)  # Enable drag-and-drop reordering
+        self.image_list = QListView()
+        self.image_list.setDragDropMode(QListView.DragDropMode.InternalMove)  # Enable drag-and-drop reordering
+        self.image_list.setDefaultDropAction(Qt.DropAction.MoveAction)
         self.image_list.setIconSize(QSize(100, 100))  # Set thumbnail size
+        self.image_list.setUniformItemSizes(True)
         layout.addWidget(self.image_list)
 
         # Right panel: Image preview and shuffle toggle
@@ -276,77 +292,64 @@ class SessionImageOrderingWindow(QDialog):
         self.setLayout(layout)
 
     def load_images(self):
-        """Load images from the provided list of paths."""
-        for image_path in self.images:
-            item = QListWidgetItem()
-            item.setText(image_path)
-
-            # Create a white background for the thumbnail
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                # Create a white background image
-                background = QPixmap(100, 100)
-                background.fill(QColor("white"))
-                painter = QPainter(background)
-                scaled_pixmap = pixmap.scaled(100, 100, aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio)
-                painter.drawPixmap(
-                    (background.width() - scaled_pixmap.width()) // 2,
-                    (background.height() - scaled_pixmap.height()) // 2,
-                    scaled_pixmap
-                )
-                painter.end()
-                item.setIcon(QIcon(background))
-
-            self.image_list.addItem(item)
+        """Load images from the playlist."""
+        # Rows and thumbnails are loaded lazily; only rows on screen request an icon
+        self.image_model = ImageListModel(
+            playlist_page_source(self.playlist),
+            icon_size=100,
+            icon_background=QColor("white"),
+            show_ids=False,
+            movable=True,
+            parent=self
+        )
+        self.image_list.setModel(self.image_model)
 
         # Connect item selection to preview
-        self.image_list.itemClicked.connect(self.on_image_selected)
+        self.image_list.clicked.connect(self.on_image_selected)
 
-    def on_image_selected(self, item):
+    def closeEvent(self, a0):
+        self.image_model.cancel_thumbnails()
+        super().closeEvent(a0)
+
+    def on_image_selected(self, index):
         """Show a preview of the selected image."""
-        image_path = item.text()
-        pixmap = QPixmap(image_path)
+        image_path = index.data(PATH_ROLE)
+        pixmap = get_pixmap_cache().get(image_path, 400)
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaled(
-                self.preview_label.size(),
-                aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                transformMode=Qt.TransformationMode.SmoothTransformation
-            )
-            self.preview_label.setPixmap(scaled_pixmap)
+            self.preview_label.setPixmap(pixmap)
         else:
             self.preview_label.setText("Failed to load image.")
 
     def toggle_shuffle_mode(self):
         """Enable or disable drag-and-drop based on shuffle mode."""
         if self.shuffle_checkbox.isChecked():
-            self.image_list.setDragDropMode(QListWidget.DragDropMode.NoDragDrop)
+            self.image_list.setDragDropMode(QListView.DragDropMode.NoDragDrop)
             self.image_list.setStyleSheet("background-color: #3B4252;")  # Visual indicator for shuffle mode
         else:
-            self.image_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+            self.image_list.setDragDropMode(QListView.DragDropMode.InternalMove)
             self.image_list.setStyleSheet("")  # Reset style
 
     def start_session_mode(self):
         """Start the session mode with the customized order."""
-        # Get the ordered image paths
-        ordered_images = []
-        for index in range(self.image_list.count()):
-            item = self.image_list.item(index)
-            if item is not None:
-                ordered_images.append(item.text())
+        # Hand the same playlist over unless rows were dragged into a new order
+        playlist = self.playlist
+        if self.image_model.reordered:
+            playlist = self.playlist.reordered(self.image_model.all_image_ids())
+        if not playlist:
+            QMessageBox.warning(self, "Error", "There are no images to play.")
+            return
 
         # Open the session player window
-        self.session_player = SessionPlayerWindow(ordered_images, self.session_duration, self.shuffle_checkbox.isChecked())
+        self.session_player = SessionPlayerWindow(playlist, self.session_duration, self.shuffle_checkbox.isChecked())
         self.session_player.show()
         self.close()
 
 
 class SessionPlayerWindow(QWidget):
-    def __init__(self, images, session_duration, shuffle_mode, parent=None):
+    def __init__(self, playlist, session_duration, shuffle_mode, parent=None):
         super().__init__(parent)
-        self.images = images
         self.session_duration = session_duration
         self.shuffle_mode = shuffle_mode
-        self.current_index = 0
         self.timer_running = False
         self.is_fullscreen = False  # Track fullscreen state
         self.setWindowTitle("Session Mode - Image Player")
@@ -372,58 +375,52 @@ class SessionPlayerWindow(QWidget):
         """)
         self.setup_ui()
 
-        # Initialize the media player for sound cues
-        self.media_player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self.audio_output)
-
-        # Set volume to 50% (adjust as needed)
-        self.audio_output.setVolume(0.5)
-
-        # Load the sound file
-        sound_file_path = os.path.abspath("src/assets/kahootSound.mp3")
-        self.media_player.setSource(QUrl.fromLocalFile(sound_file_path))
-
-        # Connect to the errorOccurred signal for debugging
-        self.media_player.errorOccurred.connect(self.handle_media_error)
-        
-        # Parse the session duration into timings
-        self.timings = self.parse_session_duration(self.session_duration)
-        self.current_timing_index = 0  # Tracks which timing is currently active
-        self.images_displayed_for_current_timing = 0  # Tracks how many images have been displayed for the current timing
-        self.remaining_time = self.timings[self.current_timing_index][1]  # Initial duration in seconds
-
-        # Shuffle the images if shuffle mode is enabled
-        if self.shuffle_mode:
-            random.shuffle(self.images)
+        # Sound cues are preloaded once for the whole app
+        self.sound_cues = get_sound_cues()
+
+        # A saved session arrives already compiled; a raw duration string is parsed once here
+        if not isinstance(self.session_duration, SessionPlan):
+            self.session_duration = parse_session_plan(self.session_duration)
+
+        # Slots, shuffle passes, soft skips and the countdown live in the engine; this
+        # window only renders it. The session plan is compiled once into an indexed
+        # timeline, so every slot (forward, Back or a jump) is an O(1) lookup.
+        # Shuffled sessions start with images this collection hasn't shown for longest
+        history, recent = None, ()
+        if playlist.collection_id is not None:
+            history = ShownHistory(playlist.collection_id)
+            if self.shuffle_mode:
+                recent = recent_positions(playlist, playlist.collection_id)
+        self.engine = PlaybackEngine(playlist, self.session_duration, self.shuffle_mode, recent=recent, history=history)
+        self.engine.subscribe(self.on_playback_event)
+        self.practice_recorder = PracticeRecorder(self.engine, MODE_SESSION)  # Logged off the UI thread
+        self.showing_break = self.engine.is_break
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.update_timer)
+
+        # Decode upcoming images in the background so transitions don't stall.
+        # Everything is decoded at roughly display size, not full resolution.
+        self.prefetcher = ImagePrefetcher(self.decode_target_size(), self)
+        self.current_image_path = None
+        self.current_decode_size = QSize()
+
+        # Re-decode at a higher resolution once the window stops growing
+        self.redecode_timer = QTimer(self)
+        self.redecode_timer.setSingleShot(True)
+        self.redecode_timer.setInterval(150)
+        self.redecode_timer.timeout.connect(self.redecode_current_image)
 
         # Display the first image immediately
         self.show_current_image()
 
-    def handle_media_error(self, error):
-        """Handle errors from the media player."""
-        error_message = self.media_player.errorString()
-        print(f"Media player error: {error_message}")
-        
     def setup_ui(self):
         layout = QVBoxLayout()
 
         # Image display
-        self.image_label = QLabel("Image Preview")
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #4C566A;
-                border-radius: 10px;
-                background-color: #3B4252;
-            }
-        """)
-        
-        # Set QLabel size policy to prevent infinite window growth
-        self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
-        self.image_label.setScaledContents(False)  # Don't allow QLabel to scale its content automatically
-
-        layout.addWidget(self.image_label, stretch=1)  # Allow the image label to expand
+        self.image_canvas = ImageCanvas("Image Preview")  # Paints from a cached scaled frame
+        layout.addWidget(self.image_canvas, stretch=1)  # Allow the image canvas to expand
 
         # Timer display
         self.timer_label = QLabel("00:00")
@@ -579,9 +576,7 @@ class SessionPlayerWindow(QWidget):
         """Start the timer to display images."""
         if not self.timer_running:
             self.timer_running = True
-            self.timer = QTimer()
-            self.timer.timeout.connect(self.update_timer)
-            self.timer.start(1000)  # Update every second
+            self.engine.start()
 
             # Hide the Start button and show the other buttons
             self.btn_start.hide()
@@ -605,8 +600,9 @@ class SessionPlayerWindow(QWidget):
         """Stop the timer."""
         if self.timer_running:
             self.timer_running = False
+            self.engine.pause()
             self.timer.stop()
-            self.media_player.stop()
+            self.sound_cues.stop()
 
             # Show the Start button and hide the other buttons
             self.btn_start.show()
@@ -628,184 +624,135 @@ class SessionPlayerWindow(QWidget):
 
     def reset_timer(self):
         """Reset the timer for the current image to its original duration."""
-        self.remaining_time = self.timings[self.current_timing_index][1]  # Reset to the current timing's duration
-        self.update_timer_display()
+        self.engine.reset_countdown()  # Reset to the current timing's duration
 
     def skip_image(self):
         """Skip to the next image."""
-        self.show_next_image()
+        self.engine.next()
 
     def soft_skip_image(self):
-        _, _, is_break = self.timings[self.current_timing_index]
-
-        if not is_break:
-            """Skip to the next image but keep the current session segment timing and reset the timer."""
-            if self.current_index >= len(self.images) - 1:
-                self.current_index = 0  # Restart from the beginning
-                if self.shuffle_mode:
-                    random.shuffle(self.images)  # Reshuffle if shuffle mode is enabled
-            else:
-                self.current_index += 1
+        """Skip to the next image but keep the current session segment timing and reset the timer."""
+        self.engine.soft_skip()
 
-            # Reset the timer for the current segment
-            self.remaining_time = self.timings[self.current_timing_index][1]  # Reset to the current timing's duration
-            self.update_timer_display()  # Update the timer label
-
-            # Show the next image
-            self.show_current_image()
-        
     def previous_image(self):
-        """Go back to the previous image and update the timing, including breaks."""
-        if self.current_index > 0:
-            self.current_index -= 1  # Move to the previous image
-
-            # Update the timing state for the previous image
-            self.update_timing_for_previous_image()
-
-            # Show the previous image
-            self.show_current_image()
+        """Go back to the previous slot (image or break) with the timing it had when played forward."""
+        self.engine.previous()
 
         # Update the Back button state
         self.update_back_button_state()
 
-    def update_timing_for_previous_image(self):
-        """Update the timing state when going back to the previous image, including breaks."""
-        # Reset the timing state
-        self.current_timing_index = 0
-        self.images_displayed_for_current_timing = 0
-
-        # Iterate through the images and timings to find the correct timing for the previous image
-        for i in range(self.current_index):
-            # Get the current timing count, duration, and whether it's a break
-            current_timing_count, _, is_break = self.timings[self.current_timing_index]
-
-            # If it's a break, skip it and move to the previous timing
-            if is_break:
-                self.current_timing_index = (self.current_timing_index - 1) % len(self.timings)
-                continue
-
-            # Check if we've displayed enough images for the current timing
-            if self.images_displayed_for_current_timing >= current_timing_count:
-                # Move to the next timing
-                self.current_timing_index = (self.current_timing_index + 1) % len(self.timings)
-                self.images_displayed_for_current_timing = 0
-
-            # Increment the counter for the current timing
-            self.images_displayed_for_current_timing += 1
-
-        # Update the remaining time for the current timing
-        self.remaining_time = self.timings[self.current_timing_index][1]
-        self.update_timer_display()
-    
     def end_session(self):
         """End the session."""
-        self.media_player.stop()
+        self.sound_cues.stop()
+        self.prefetcher.clear()
         self.stop_timer()
         self.close()
 
+    def closeEvent(self, a0):
+        # Stop first: closing publishes an event, which would otherwise re-arm the timer
+        self.stop_timer()
+        self.engine.close()  # Remember what was shown for the next shuffled session
+        super().closeEvent(a0)
+
     def update_timer(self):
-        """Update the countdown timer."""
-        if self.remaining_time > 0:
-            self.remaining_time -= 1
-            self.update_timer_display()
-            
-            # Play a sound cue if the timer is under 10 seconds
-            if self.remaining_time <= 10:
-                self.media_player.play()
-            else:
-                self.media_player.stop()
+        """Update the countdown timer on a second boundary, moving on when the deadline passes."""
+        if self.engine.tick():
+            return  # Moved on; on_playback_event restarted the display and rescheduled
+
+        self.update_timer_display()
+
+        # Play the countdown cue through the last seconds
+        self.sound_cues.update_countdown(self.engine.countdown.remaining_seconds())
+        self.schedule_tick()
+
+    def schedule_tick(self):
+        """Arm the timer for the moment the displayed seconds next change."""
+        if self.timer_running:
+            self.timer.start(self.engine.countdown.ms_until_next_second())
+
+    def on_playback_event(self, event, engine):
+        """Re-render after the engine changes slot or image, or restarts the countdown."""
+        if event == SLOT_CHANGED:
+            self.play_transition_cue()  # Cue first so the sound lands with the new slot
+        if event in (SLOT_CHANGED, SOFT_SKIPPED):
+            self.show_current_image()
+        if engine.running:
+            self.sound_cues.update_countdown(engine.countdown.remaining_seconds())
+        self.update_timer_display()
+        self.schedule_tick()
+
+    def play_transition_cue(self):
+        """Play the cue for entering the current slot: break start, break end or a plain transition."""
+        if self.engine.is_break and not self.showing_break:
+            self.sound_cues.play(CUE_BREAK_START)
+        elif not self.engine.is_break and self.showing_break:
+            self.sound_cues.play(CUE_BREAK_END)
         else:
-            # Move to the next image and update the timing
-            self.show_next_image()
+            self.sound_cues.play(CUE_TRANSITION)
+        self.showing_break = self.engine.is_break
 
     def show_current_image(self):
         """Display the current image or break message."""
-        _, _, is_break = self.timings[self.current_timing_index]
-
-        if is_break:
+        if self.engine.is_break:
             # Show break message
-            self.image_label.setText("You deserve a break!!")
-            self.image_label.setStyleSheet("""
-                QLabel {
-                    font-size: 48px;
-                    font-weight: bold;
-                    color: #ECEFF4;
-                }
-            """)
+            self.current_image_path = None
+            self.image_canvas.set_text("You deserve a break!!", pixel_size=48, bold=True)
         else:
             # Show the current image
-            image_path = self.images[self.current_index]
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                self.current_pixmap = pixmap  # Store the original pixmap
-                self.update_image_size()
+            image_path = self.engine.current_image_path()
+            image = self.prefetcher.take(image_path)
+            if image is None:
+                image = read_image(image_path, self.prefetcher.target_size)  # Not prefetched yet, decode now
+            self.current_image_path = image_path
+            self.current_decode_size = self.prefetcher.target_size
+            if not image.isNull():
+                self.image_canvas.set_pixmap(QPixmap.fromImage(image), image_path)  # Decoded at roughly display size
             else:
-                self.image_label.setText("Failed to load image.")
+                self.image_canvas.set_text("Failed to load image.")
 
         # Update the Back button state
         self.update_back_button_state()
+        self.prefetch_upcoming_images()
 
-    def update_image_size(self):
-        """Update image size dynamically without resizing QLabel."""
-        if hasattr(self, "current_pixmap") and not self.current_pixmap.isNull():
-            scaled_pixmap = self.current_pixmap.scaled(
-                self.image_label.width(),
-                self.image_label.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
+    def prefetch_upcoming_images(self):
+        """Queue background decodes for the next images and the previous one (for Back)."""
+        self.prefetcher.prefetch(self.engine.prefetch_paths(PREFETCH_AHEAD))
 
     def resizeEvent(self, a0: typing.Optional[QResizeEvent]):
-        """Prevent QLabel from causing infinite window growth."""
-        if hasattr(self, "current_pixmap") and not self.current_pixmap.isNull():
-            self.update_image_size()
+        """The canvas rescales itself; re-decode once the window stops changing size."""
+        if hasattr(self, "redecode_timer"):
+            self.redecode_timer.start()
         super().resizeEvent(a0)
 
-    def show_next_image(self):
-        """Display the next image or break and update the timing."""
-        # Increment the number of images displayed for the current timing
-        self.images_displayed_for_current_timing += 1
-
-        # Check if we've displayed enough images for the current timing
-        current_timing_count, _, is_break = self.timings[self.current_timing_index]
-        if self.images_displayed_for_current_timing >= current_timing_count:
-            # Move to the next timing
-            self.current_timing_index = (self.current_timing_index + 1) % len(self.timings)
-            self.images_displayed_for_current_timing = 0  # Reset the counter for the new timing
-
-        # Update the remaining time for the new timing
-        self.remaining_time = self.timings[self.current_timing_index][1]
-
-        # Move to the next image (if not a break)
-        if not is_break:
-            if self.current_index >= len(self.images) - 1:
-                self.current_index = 0  # Restart from the beginning
-                if self.shuffle_mode:
-                    random.shuffle(self.images)  # Reshuffle if shuffle mode is enabled
-            else:
-                self.current_index += 1
-
-        # Display the next image or break
-        self.show_current_image()
-
-    def reset_timing_for_current_image(self):
-        """Reset the timing for the current image."""
-        self.remaining_time = self.timings[self.current_timing_index][1]
-        self.update_timer_display()
+    def decode_target_size(self):
+        """Return the pixel size images should be decoded to for the current window."""
+        widget = self.image_canvas if self.isVisible() else self
+        return display_decode_size(widget)
+
+    def redecode_current_image(self):
+        """Decode the current image again if the display outgrew the resolution it was decoded at."""
+        target = self.decode_target_size()
+        self.prefetcher.set_target_size(target)
+        if self.current_image_path is not None and not covers(self.current_decode_size, target):
+            full_size = source_size(self.current_image_path)
+            # Only worth it if the first decode was downscaled
+            if full_size.isValid() and not covers(self.image_canvas.pixmap().size(), full_size):
+                image = read_image(self.current_image_path, target)
+                if not image.isNull():
+                    self.image_canvas.set_pixmap(QPixmap.fromImage(image), self.current_image_path)
+            self.current_decode_size = target
+        self.prefetch_upcoming_images()
 
     def update_timer_display(self):
         """Update the timer display."""
-        minutes = self.remaining_time // 60
-        seconds = self.remaining_time % 60
+        remaining = self.engine.countdown.remaining_seconds()
+        minutes = remaining // 60
+        seconds = remaining % 60
         self.timer_label.setText(f"{minutes:02}:{seconds:02}")
 
     def update_back_button_state(self):
-        """Enable or disable the Back button based on the current image index."""
-        if self.current_index == 0:
-            self.btn_back.setEnabled(False)  # Disable if it's the first image
-        else:
-            self.btn_back.setEnabled(True)  # Enable otherwise
+        """Enable or disable the Back button based on the current slot."""
+        self.btn_back.setEnabled(self.engine.can_go_back())  # Disabled on the first slot
 
     def toggle_fullscreen(self):
         """Toggle between fullscreen and normal mode."""
@@ -835,40 +782,22 @@ class SessionPlayerWindow(QWidget):
                 self.end_session()
             elif a0.key() == Qt.Key.Key_F11:  # Toggle fullscreen
                 self.toggle_fullscreen()
+            elif a0.key() in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):  # Zoom in
+                self.image_canvas.zoom_by(ZOOM_STEP)
+            elif a0.key() == Qt.Key.Key_Minus:  # Zoom out
+                self.image_canvas.zoom_by(1 / ZOOM_STEP)
+            elif a0.key() == Qt.Key.Key_0:  # Fit the whole image again
+                self.image_canvas.reset_zoom()
+            elif a0.key() == Qt.Key.Key_Left:  # Pan while zoomed
+                self.image_canvas.pan_by(PAN_STEP, 0)
+            elif a0.key() == Qt.Key.Key_Right:
+                self.image_canvas.pan_by(-PAN_STEP, 0)
+            elif a0.key() == Qt.Key.Key_Up:
+                self.image_canvas.pan_by(0, PAN_STEP)
+            elif a0.key() == Qt.Key.Key_Down:
+                self.image_canvas.pan_by(0, -PAN_STEP)
+
 
-    def parse_session_duration(self, duration_str):
-        """Parse a session duration string into a list of (count, duration, is_break) tuples."""
-        # Extract the duration part from the session string (e.g., "keke: 2x30sec" -> "2x30sec")
-        if ": " in duration_str:
-            duration_str = duration_str.split(": ")[1]  # Get the part after ": "
-
-        segments = duration_str.split(" + ")
-        timings = []
-        for segment in segments:
-            if "break" in segment:
-                # Handle break time
-                # Example: "1x5min break" -> count=1, duration=5min
-                count, duration_part = segment.split("x")
-                duration = int(duration_part.replace("min break", "")) * 60
-                timings.append((int(count), duration, True))  # Break is a single event
-            else:
-                # Handle regular image timings
-                # Example: "2x30sec" -> count=2, duration=30sec
-                count, duration_part = segment.split("x")
-                if "sec" in duration_part:
-                    duration = int(duration_part.replace("sec", ""))
-                elif "min" in duration_part:
-                    duration = int(duration_part.replace("min", "")) * 60
-                if "sec" in duration_part:
-                    duration = int(duration_part.replace("sec", ""))
-                elif "min" in duration_part:
-                    duration = int(duration_part.replace("min", "")) * 60
-                else:
-                    raise ValueError(f"Invalid duration format: {duration_part}")
-                timings.append((int(count), duration, False))  # Regular image timing
-        return timings
-
-    
 class CustomSessionDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -944,11 +873,7 @@ class CustomSessionDialog(QDialog):
 
     def load_existing_sessions(self):
         """Load existing sessions from the database."""
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sessions")
-        sessions = cursor.fetchall()
-        conn.close()
+        sessions = fetch_all("SELECT name FROM sessions")
 
         for (name,) in sessions:
             self.session_dropdown.addItem(name)
@@ -962,23 +887,18 @@ class CustomSessionDialog(QDialog):
             self.segments = []
             return
 
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT duration FROM sessions WHERE name = ?", (selected_session,))
-        session_data = cursor.fetchone()
-        conn.close()
+        session_data = fetch_one("SELECT duration FROM sessions WHERE name = ?", (selected_session,))
 
         if session_data:
             self.session_name_input.setText(selected_session)
             self.segments_list.clear()
-            self.segments = parse_session_duration(session_data[0])
-            for count, duration, unit, segment_type in self.segments:
-                if unit == "minutes":
-                    formatted_duration = f"{duration // 60}min"
-                else:
-                    formatted_duration = f"{duration}sec"
-                
-                self.segments_list.addItem(f"{count}x{formatted_duration} ({segment_type})")
+            try:
+                self.segments = list(parse_session_plan(session_data[0]).segments)
+            except SessionParseError as e:
+                self.segments = []
+                QMessageBox.warning(self, "Error", f"Could not load session: {e}")
+            for segment in self.segments:
+                self.segments_list.addItem(self.format_segment(segment))
 
     def add_segment(self):
         count = self.segment_count_input.value()
@@ -986,9 +906,14 @@ class CustomSessionDialog(QDialog):
         unit = self.unit_dropdown.currentText()
         segment_type = self.type_dropdown.currentText()
 
-        segment_str = f"{count}x{duration} {unit} ({segment_type})"
-        self.segments_list.addItem(segment_str)
-        self.segments.append((count, duration, unit, segment_type))
+        # Segments always hold seconds, whether added here or loaded from a saved session
+        segment = Segment(count, duration * 60 if unit == "minutes" else duration, unit, segment_type == "break")
+        self.segments_list.addItem(self.format_segment(segment))
+        self.segments.append(segment)
+
+    def format_segment(self, segment):
+        duration = SessionPlan([segment]).to_string().removesuffix(" break")
+        return f"{duration} ({'break' if segment.is_break else 'active'})"
 
     def delete_segment(self):
         selected_item = self.segments_list.currentItem()
@@ -1006,21 +931,6 @@ class CustomSessionDialog(QDialog):
             QMessageBox.warning(self, "Error", "Please add at least one segment.")
             return
 
-        session_duration = self.convert_segments_to_duration(self.segments)
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-
-        if self.session_dropdown.currentText() == "New Session":
-            cursor.execute("INSERT INTO sessions (name, duration) VALUES (?, ?)", (session_name, session_duration))
-        else:
-            cursor.execute("UPDATE sessions SET duration = ? WHERE name = ?", (session_duration, session_name))
-        
-        conn.commit()
-        conn.close()
+        plan = SessionPlan(self.segments)
+        save_session_plan(session_name, plan, update=self.session_dropdown.currentText() != "New Session")
         self.close()
-
-    def convert_segments_to_duration(self, segments):
-        return " + ".join(
-            [f"{count}x{duration}{'min' if unit == 'minutes' else 'sec'} {'break' if segment_type == 'break' else ''}".strip()
-             for count, duration, unit, segment_type in segments]
-        )
\ No newline at end of file
@@ -0,0 +1,122 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QPushButton, QTabWidget
+from utils.practice_log import get_practice_log
+from utils.practice_stats import (
+    format_seconds, totals, totals_since, daily_totals, weekly_totals, collection_totals,
+    most_shown_images, least_shown_images
+)
+from datetime import date, timedelta
+import os
+
+class StatisticsWindow(QWidget):
+    """Practice time per day, week, collection and image, read from the rollup tables."""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Practice Statistics")
+        self.setGeometry(150, 150, 500, 500)
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #2E3440;
+            }
+            QPushButton {
+                background-color: #4C566A;
+                color: #ECEFF4;
+                border-radius: 5px;
+                padding: 10px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #5E81AC;
+            }
+            QListWidget {
+                background-color: #3B4252;
+                color: #ECEFF4;
+                border: 1px solid #4C566A;
+                border-radius: 5px;
+                padding: 5px;
+                font-size: 14px;
+            }
+            QListWidget::item {
+                padding: 5px;
+            }
+            QLabel {
+                color: #ECEFF4;
+                font-size: 16px;
+            }
+            QTabBar::tab {
+                background-color: #3B4252;
+                color: #ECEFF4;
+                padding: 6px 10px;
+            }
+            QTabBar::tab:selected {
+                background-color: #5E81AC;
+            }
+        """)
+        self.setup_ui()
+        self.load_statistics()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.daily_list = QListWidget()
+        self.weekly_list = QListWidget()
+        self.collection_list = QListWidget()
+        self.most_shown_list = QListWidget()
+        self.least_shown_list = QListWidget()
+        self.tabs.addTab(self.daily_list, "Daily")
+        self.tabs.addTab(self.weekly_list, "Weekly")
+        self.tabs.addTab(self.collection_list, "Collections")
+        self.tabs.addTab(self.most_shown_list, "Most Shown")
+        self.tabs.addTab(self.least_shown_list, "Least Shown")
+        layout.addWidget(self.tabs)
+
+        buttons_layout = QHBoxLayout()
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(self.load_statistics)
+        buttons_layout.addWidget(btn_refresh)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+    def load_statistics(self):
+        # Rows from a session that just ended may still be in the write-behind buffer
+        get_practice_log().flush(timeout=1.0)
+
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+        total_seconds, total_images = totals()
+        today_seconds, _ = totals_since(today.isoformat())
+        week_seconds, _ = totals_since(week_start.isoformat())
+        self.summary_label.setText(
+            f"Total: {format_seconds(total_seconds)} over {total_images} images\n"
+            f"Today: {format_seconds(today_seconds)}    This week: {format_seconds(week_seconds)}"
+        )
+
+        self.fill_list(self.daily_list, [
+            f"{day}: {format_seconds(seconds)} ({images} images)" for day, seconds, images in daily_totals()
+        ])
+        self.fill_list(self.weekly_list, [
+            f"Week of {week}: {format_seconds(seconds)} ({images} images)" for week, seconds, images in weekly_totals()
+        ])
+        self.fill_list(self.collection_list, [
+            f"{name}: {format_seconds(seconds)} ({images} images)" for name, seconds, images in collection_totals()
+        ])
+        self.fill_list(self.most_shown_list, [
+            f"{os.path.basename(path)}: shown {shown}x, {format_seconds(seconds)}"
+            for _, path, shown, seconds in most_shown_images()
+        ])
+        self.fill_list(self.least_shown_list, [
+            f"{os.path.basename(path)}: shown {shown}x, {format_seconds(seconds)}"
+            for _, path, shown, seconds in least_shown_images()
+        ])
+
+    def fill_list(self, list_widget, lines):
+        list_widget.clear()
+        if lines:
+            list_widget.addItems(lines)
+        else:
+            list_widget.addItem("No practice recorded yet")
@@ -1,7 +1,74 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, QLabel, QHBoxLayout, QSplitter, QFileDialog, QMessageBox
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QPixmap
-import sqlite3
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListView, QPushButton, QLabel, QHBoxLayout, QSplitter, QFileDialog, QMessageBox, QCheckBox, QProgressDialog
+from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
+from storage import fetch_one, open_connection, get_connection, transaction
+from utils.image_import import iter_image_files, import_image_paths
+from utils.image_meta import get_meta_scanner
+from utils.perceptual_hash import HammingIndex, hash_pending_images, to_unsigned, SIMILAR_DISTANCE
+from utils.pixmap_cache import get_pixmap_cache
+from utils.playlist import Playlist
+from ui.image_list_model import ImageListModel, sql_page_source, playlist_page_source, IMAGE_ID_ROLE, PATH_ROLE
+import os
+import threading
+
+
+class ImportWorker(QThread):
+    """Hashes and inserts images on a background thread.
+
+    `paths` is any iterable of file paths; for a folder it's the lazy
+    iter_image_files walk, so the walk happens on this thread too.
+    """
+    progress = pyqtSignal(int)  # Number of images inserted so far
+    completed = pyqtSignal(int, int, bool)  # Number inserted, duplicates skipped, whether the import was cancelled
+    failed = pyqtSignal(str)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        # SQLite connections can't be shared with the GUI thread's transaction, so use our own
+        conn = open_connection()
+        try:
+            inserted, skipped = import_image_paths(
+                conn,
+                self.paths,
+                on_progress=self.progress.emit,
+                is_cancelled=self._cancel_event.is_set,
+            )
+            self.completed.emit(inserted, skipped, self._cancel_event.is_set())
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            conn.close()
+
+
+class PerceptualHashWorker(QThread):
+    """Computes missing perceptual hashes on a background thread."""
+    progress = pyqtSignal(int)  # Number of images processed so far
+    completed = pyqtSignal(bool)  # Whether hashing was cancelled
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        conn = open_connection()
+        try:
+            hash_pending_images(conn, on_progress=self.progress.emit, is_cancelled=self._cancel_event.is_set)
+            self.completed.emit(self._cancel_event.is_set())
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            conn.close()
+
 
 class StorageWindow(QWidget):
     def __init__(self):
@@ -22,7 +89,7 @@ class StorageWindow(QWidget):
             QPushButton:hover {
                 background-color: #5E81AC;
             }
-            QListWidget {
+            QListView {
                 background-color: #3B4252;
                 color: #ECEFF4;
                 border: 1px solid #4C566A;
@@ -30,10 +97,10 @@ class StorageWindow(QWidget):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #5E81AC;
                 color: #ECEFF4;
             }
@@ -42,6 +109,8 @@ class StorageWindow(QWidget):
                 font-size: 16px;
             }
         """)
+        self.similarity_index = None  # Built on first use, dropped whenever the library changes
+        self.filtered_ids = None  # Image ids shown instead of the whole library, if any
         self.setup_ui()
 
     def setup_ui(self):
@@ -51,20 +120,56 @@ class StorageWindow(QWidget):
         left_panel = QWidget()
         left_layout = QVBoxLayout()
 
-        self.image_list = QListWidget()
+        self.list_label = QLabel("All Images")
+        left_layout.addWidget(self.list_label)
+
+        # Rows are paged in from the database as the list scrolls
+        self.image_list = QListView()
         self.image_list.setIconSize(QSize(64, 64))
-        self.image_list.itemClicked.connect(self.on_image_selected)
-        self.load_images()
+        self.image_list.setUniformItemSizes(True)
+        self.image_model = ImageListModel(
+            sql_page_source("SELECT id, id, path FROM images WHERE id > ? ORDER BY id LIMIT ?"),
+            icon_size=64,
+            parent=self
+        )
+        self.image_list.setModel(self.image_model)
+        self.image_list.clicked.connect(self.on_image_selected)
         left_layout.addWidget(self.image_list)
 
-        btn_add_images = QPushButton("Add Images")
-        btn_add_images.clicked.connect(self.add_images)
-        left_layout.addWidget(btn_add_images)
+        self.btn_add_images = QPushButton("Add Images")
+        self.btn_add_images.clicked.connect(self.add_images)
+        left_layout.addWidget(self.btn_add_images)
+
+        # Folder import runs in the background
+        folder_layout = QHBoxLayout()
+        self.btn_add_folder = QPushButton("Add Folder")
+        self.btn_add_folder.clicked.connect(self.add_folder)
+        folder_layout.addWidget(self.btn_add_folder)
+
+        self.include_subfolders_checkbox = QCheckBox("Include Subfolders")
+        self.include_subfolders_checkbox.setChecked(True)
+        folder_layout.addWidget(self.include_subfolders_checkbox)
+        left_layout.addLayout(folder_layout)
 
         btn_delete_image = QPushButton("Delete Selected Image")
         btn_delete_image.clicked.connect(self.delete_selected_image)
         left_layout.addWidget(btn_delete_image)
 
+        # Near-duplicate search by perceptual hash
+        similar_layout = QHBoxLayout()
+        btn_find_similar = QPushButton("Find Similar")
+        btn_find_similar.clicked.connect(self.find_similar)
+        similar_layout.addWidget(btn_find_similar)
+
+        btn_group_duplicates = QPushButton("Group Duplicates")
+        btn_group_duplicates.clicked.connect(self.group_duplicates)
+        similar_layout.addWidget(btn_group_duplicates)
+
+        btn_show_all = QPushButton("Show All")
+        btn_show_all.clicked.connect(self.show_all_images)
+        similar_layout.addWidget(btn_show_all)
+        left_layout.addLayout(similar_layout)
+
         left_panel.setLayout(left_layout)
 
         # Right panel: Image preview
@@ -85,53 +190,180 @@ class StorageWindow(QWidget):
         main_layout.addWidget(splitter)
         self.setLayout(main_layout)
 
-    def on_image_selected(self, item):
-        image_path = item.text().split(": ")[1]
-        pixmap = QPixmap(image_path)
+    def on_image_selected(self, index):
+        image_path = index.data(PATH_ROLE)
+        # Set a fixed size for the preview label
+        self.preview_label.setFixedSize(200, 200)  # Adjust the size as needed
+        # The cached thumbnail is already scaled to fit the fixed size
+        pixmap = get_pixmap_cache().get(image_path, 200, index.data(IMAGE_ID_ROLE))
         if not pixmap.isNull():
-            # Set a fixed size for the preview label
-            self.preview_label.setFixedSize(200, 200)  # Adjust the size as needed
-            # Scale the image to fit the fixed size
-            scaled_pixmap = pixmap.scaled(
-                self.preview_label.size(),
-                aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                transformMode=Qt.TransformationMode.SmoothTransformation
-            )
-            self.preview_label.setPixmap(scaled_pixmap)
+            self.preview_label.setPixmap(pixmap)
         else:
             self.preview_label.setText("Failed to load image.")
             
     def load_images(self):
-        self.image_list.clear()
-        conn = sqlite3.connect("image_timer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, path FROM images")
-        images = cursor.fetchall()
-        conn.close()
-        for img in images:
-            item = QListWidgetItem(f"{img[0]}: {img[1]}")
-            self.image_list.addItem(item)
+        self.similarity_index = None
+        if self.filtered_ids is not None:
+            self.image_model.set_page_source(playlist_page_source(Playlist(self.filtered_ids)))
+        else:
+            self.image_model.refresh()
+
+    def show_filtered_images(self, image_ids, label):
+        self.filtered_ids = image_ids
+        self.list_label.setText(label)
+        self.image_model.set_page_source(playlist_page_source(Playlist(image_ids)))
+
+    def show_all_images(self):
+        self.filtered_ids = None
+        self.list_label.setText("All Images")
+        self.image_model.set_page_source(
+            sql_page_source("SELECT id, id, path FROM images WHERE id > ? ORDER BY id LIMIT ?")
+        )
+
+    def with_similarity_index(self, then):
+        """Call then(index) once every image has a perceptual hash, hashing the rest in the background first."""
+        if fetch_one("SELECT EXISTS (SELECT 1 FROM images WHERE perceptual_hash IS NULL)")[0]:
+            worker = getattr(self, "hash_worker", None)
+            if worker is not None and worker.isRunning():
+                return
+            pending = fetch_one("SELECT COUNT(*) FROM images WHERE perceptual_hash IS NULL")[0]
+            self.hash_progress = QProgressDialog("Hashing images...", "Cancel", 0, pending, self)
+            self.hash_progress.setWindowTitle("Finding Similar Images")
+            self.hash_progress.setMinimumDuration(0)
+            self.hash_worker = PerceptualHashWorker(self)
+            self.hash_worker.progress.connect(self.hash_progress.setValue)
+            self.hash_worker.completed.connect(lambda cancelled: self.on_hashing_completed(cancelled, then))
+            self.hash_worker.failed.connect(self.on_hashing_failed)
+            self.hash_progress.canceled.connect(self.hash_worker.cancel)
+            self.hash_worker.start()
+            self.hash_progress.show()
+            return
+        if self.similarity_index is None:
+            self.similarity_index = HammingIndex.load(get_connection())
+        then(self.similarity_index)
+
+    def on_hashing_completed(self, cancelled, then):
+        self.hash_progress.close()
+        if cancelled:
+            return
+        # Unreadable images stay unhashed; search what could be hashed
+        self.similarity_index = HammingIndex.load(get_connection())
+        then(self.similarity_index)
+
+    def on_hashing_failed(self, message):
+        self.hash_progress.close()
+        QMessageBox.warning(self, "Error", f"Hashing images failed: {message}")
+
+    def find_similar(self):
+        """List images that look like the selected one, closest first."""
+        selected_index = self.image_list.currentIndex()
+        if not selected_index.isValid():
+            QMessageBox.warning(self, "Warning", "Select an image first.")
+            return
+        image_id = selected_index.data(IMAGE_ID_ROLE)
+        path = selected_index.data(PATH_ROLE)
+
+        def show(index):
+            row = fetch_one("SELECT perceptual_hash FROM images WHERE id = ?", (image_id,))
+            if row is None or row[0] is None:
+                QMessageBox.warning(self, "Warning", "The selected image could not be read.")
+                return
+            matches = [match_id for _, match_id in index.query(to_unsigned(row[0]), SIMILAR_DISTANCE)]
+            self.show_filtered_images(matches, f"Similar to {os.path.basename(path)} ({len(matches) - 1} found)")
+
+        self.with_similarity_index(show)
+
+    def group_duplicates(self):
+        """List near-duplicate images group by group, largest groups first."""
+        def show(index):
+            groups = index.duplicate_groups()
+            if not groups:
+                QMessageBox.information(self, "No Duplicates", "No near-duplicate images were found.")
+                return
+            self.show_filtered_images(
+                [image_id for group in groups for image_id in group],
+                f"{len(groups)} groups of near-duplicates",
+            )
+
+        self.with_similarity_index(show)
 
     def add_images(self):
         options = QFileDialog.Option.DontUseNativeDialog
         file_paths, _ = QFileDialog.getOpenFileNames(self, "Select Images", "", "Images (*.png *.jpg *.jpeg *.gif *.webp)", options=options)
         
         if file_paths:
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            for path in file_paths:
-                cursor.execute("INSERT INTO images (path, collection) VALUES (?, ?)", (path, "Uncategorized"))
-            conn.commit()
-            conn.close()
-            self.load_images()
+            # Every file is read and hashed, so this runs off the GUI thread like a folder import
+            self.start_import(file_paths, "Hashing images...")
+
+    def add_folder(self):
+        """Import every image in a folder (optionally recursive) without blocking the window."""
+        options = QFileDialog.Option.DontUseNativeDialog | QFileDialog.Option.ShowDirsOnly
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder", "", options=options)
+        if not folder:
+            return
+        self.start_import(iter_image_files(folder, self.include_subfolders_checkbox.isChecked()), "Scanning folder...")
+
+    def start_import(self, paths, label):
+        """Import `paths` on an ImportWorker behind a cancellable progress dialog."""
+        self.btn_add_images.setEnabled(False)
+        self.btn_add_folder.setEnabled(False)
+        self.import_progress = QProgressDialog(label, "Cancel", 0, 0, self)
+        self.import_progress.setWindowTitle("Importing Images")
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.setAutoClose(False)
+        self.import_progress.setAutoReset(False)
+
+        self.import_worker = ImportWorker(paths, self)
+        self.import_worker.progress.connect(self.on_import_progress)
+        self.import_worker.completed.connect(self.on_import_completed)
+        self.import_worker.failed.connect(self.on_import_failed)
+        self.import_progress.canceled.connect(self.import_worker.cancel)
+        self.import_worker.start()
+        self.import_progress.show()
+
+    def on_import_progress(self, inserted):
+        self.import_progress.setLabelText(f"Imported {inserted} images...")
+
+    def on_import_completed(self, inserted, skipped, cancelled):
+        self.finish_import()
+        if inserted:
+            get_meta_scanner().request()  # Read the new images' headers in the background
+        if cancelled:
+            QMessageBox.information(self, "Import Cancelled", f"The import was cancelled after adding {inserted} images.")
+        else:
+            message = f"Added {inserted} images."
+            if skipped:
+                message += f" Skipped {skipped} already in the library."
+            QMessageBox.information(self, "Import Complete", message)
+        self.load_images()
+
+    def on_import_failed(self, message):
+        self.finish_import()
+        QMessageBox.warning(self, "Error", f"Import failed: {message}")
+
+    def finish_import(self):
+        self.import_progress.close()
+        self.btn_add_images.setEnabled(True)
+        self.btn_add_folder.setEnabled(True)
+
+    def closeEvent(self, a0):
+        """Stop a running import or hashing pass before the window goes away."""
+        for name in ("import_worker", "hash_worker"):
+            worker = getattr(self, name, None)
+            if worker is not None and worker.isRunning():
+                worker.cancel()
+                worker.wait()
+        super().closeEvent(a0)
 
     def delete_selected_image(self):
-        selected_item = self.image_list.currentItem()
-        if selected_item:
-            image_id = selected_item.text().split(":")[0]
-            conn = sqlite3.connect("image_timer.db")
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM images WHERE id = ?", (image_id,))
-            conn.commit()
-            conn.close()
+        selected_index = self.image_list.currentIndex()
+        if selected_index.isValid():
+            image_id = selected_index.data(IMAGE_ID_ROLE)
+            # Links are removed explicitly, so the delete never depends on the foreign key cascade
+            with transaction() as conn:
+                conn.execute("DELETE FROM collection_images WHERE image_id = ?", (image_id,))
+                conn.execute("DELETE FROM images WHERE id = ?", (image_id,))
+            get_pixmap_cache().invalidate(image_id)
+            if self.filtered_ids is not None:
+                self.filtered_ids = [i for i in self.filtered_ids if i != image_id]
             self.load_images()
\ No newline at end of file
@@ -0,0 +1,18 @@
+from PyQt6.QtCore import QStandardPaths
+import os
+
+# Subdirectory of the platform's generic cache location (e.g. ~/.cache on Linux)
+APP_CACHE_DIR = "morpice-image-player"
+
+
+def cache_path(name):
+    """Return `name` inside the app's cache directory, creating the directory.
+
+    Falls back to the working directory if the platform reports no cache location.
+    """
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+    if not base:
+        return name
+    directory = os.path.join(base, APP_CACHE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
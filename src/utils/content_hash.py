@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import sqlite3
+
+# hashlib releases the GIL while hashing large buffers, so threads hash in parallel
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# Bytes read per update() call
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files submitted to the pool at a time; bounds memory on huge imports
+HASH_BATCH_SIZE = 256
+
+
+def hash_file(path):
+    """Return the hex content hash of a file, or None if it can't be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_paths(items, workers=HASH_WORKERS, key=None):
+    """Hash files on a worker pool, yielding (item, hash) in input order.
+
+    `items` may be any iterable (paths, or rows with key(row) giving the
+    path); it is consumed HASH_BATCH_SIZE at a time.
+    """
+    key = key or (lambda item: item)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="content-hash") as pool:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= HASH_BATCH_SIZE:
+                yield from zip(batch, pool.map(hash_file, [key(i) for i in batch]))
+                batch = []
+        if batch:
+            yield from zip(batch, pool.map(hash_file, [key(i) for i in batch]))
+
+
+def merge_images(cursor, keep_id, duplicate_id):
+    """Fold a duplicate image row into `keep_id` and delete it.
+
+    Collection links, practice history and recent-image entries move to the
+    kept row; whatever would collide is left for the cascade to remove.
+    """
+    cursor.execute('''
+        INSERT OR IGNORE INTO collection_images (collection_id, image_id)
+        SELECT collection_id, ? FROM collection_images WHERE image_id = ?
+    ''', (keep_id, duplicate_id))
+    cursor.execute("UPDATE practice_log SET image_id = ? WHERE image_id = ?", (keep_id, duplicate_id))
+    cursor.execute('''
+        INSERT INTO practice_image_totals (image_id, seconds, shown, last_shown)
+        SELECT ?, seconds, shown, last_shown FROM practice_image_totals WHERE image_id = ?
+        ON CONFLICT (image_id) DO UPDATE SET
+            seconds = seconds + excluded.seconds, shown = shown + excluded.shown,
+            last_shown = max(last_shown, excluded.last_shown)
+    ''', (keep_id, duplicate_id))
+    cursor.execute('''
+        INSERT INTO recent_images (collection_id, image_id, shown_at)
+        SELECT collection_id, ?, shown_at FROM recent_images WHERE image_id = ?
+        ON CONFLICT (collection_id, image_id) DO UPDATE SET shown_at = max(shown_at, excluded.shown_at)
+    ''', (keep_id, duplicate_id))
+    cursor.execute("DELETE FROM images WHERE id = ?", (duplicate_id,))
+
+
+def _store_hashes(conn, results):
+    """Save (image_id, hash) pairs in one transaction, merging rows whose hash is taken."""
+    hashed = merged = 0
+    with conn:
+        cursor = conn.cursor()
+        for image_id, content_hash in results:
+            try:
+                cursor.execute("UPDATE images SET content_hash = ? WHERE id = ?", (content_hash, image_id))
+                hashed += 1
+            except sqlite3.IntegrityError:
+                (keep_id,) = cursor.execute("SELECT id FROM images WHERE content_hash = ?", (content_hash,)).fetchone()
+                merge_images(cursor, keep_id, image_id)
+                merged += 1
+    return hashed, merged
+
+
+def hash_pending_images(conn, on_progress=None, is_cancelled=None):
+    """Hash every image without a content hash, merging rows whose file is already in the library.
+
+    A row that already holds the hash is kept; among unhashed rows the older
+    one wins, since rows are hashed in id order. Results are written a batch
+    at a time, so the write lock isn't held while files are read and
+    cancelling keeps the work done so far. Unreadable files stay unhashed.
+    Returns (hashed, merged).
+    """
+    rows = conn.execute("SELECT id, path FROM images WHERE content_hash IS NULL ORDER BY id").fetchall()
+    hashed = merged = 0
+    results = []
+    for done, ((image_id, _), content_hash) in enumerate(hash_paths(rows, key=lambda row: row[1]), start=1):
+        if is_cancelled is not None and is_cancelled():
+            break
+        if content_hash is not None:
+            results.append((image_id, content_hash))
+        if done % HASH_BATCH_SIZE == 0:
+            counts = _store_hashes(conn, results)
+            hashed, merged, results = hashed + counts[0], merged + counts[1], []
+            if on_progress is not None:
+                on_progress(done)
+    counts = _store_hashes(conn, results)
+    return hashed + counts[0], merged + counts[1]
+
+
+def merge_duplicate_paths(conn):
+    """Merge rows that share a path into the oldest one. Returns the number of rows removed."""
+    duplicates = conn.execute('''
+        SELECT i.id, keep.id
+        FROM images i
+        JOIN (SELECT path, MIN(id) AS id FROM images GROUP BY path HAVING COUNT(*) > 1) keep
+            ON keep.path = i.path AND i.id != keep.id
+    ''').fetchall()
+    with conn:
+        cursor = conn.cursor()
+        for duplicate_id, keep_id in duplicates:
+            merge_images(cursor, keep_id, duplicate_id)
+    return len(duplicates)
+
+
+def dedupe_library(conn, on_progress=None):
+    """One-shot cleanup of a library imported before content hashing.
+
+    Returns (rows merged by path, rows merged by content, images hashed).
+    """
+    by_path = merge_duplicate_paths(conn)
+    hashed, by_content = hash_pending_images(conn, on_progress)
+    return by_path, by_content, hashed
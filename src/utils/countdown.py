@@ -0,0 +1,80 @@
+import math
+import time
+
+
+class Countdown:
+    """Deadline-based countdown on a monotonic clock.
+
+    Instead of decrementing once per timer tick (which accumulates tick
+    jitter and event-loop stalls), the remaining time is always computed
+    from a fixed deadline, so pause, resume, reset and skip stay exact.
+    """
+
+    def __init__(self, duration=0, clock=time.monotonic):
+        self.clock = clock
+        self.duration = duration
+        self._remaining = float(duration)  # Used while paused
+        self._deadline = None  # Set while running
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    def start(self):
+        """Start or resume counting down from the remaining time."""
+        if self._deadline is None:
+            self._deadline = self.clock() + self._remaining
+
+    def pause(self):
+        """Freeze the remaining time."""
+        if self._deadline is not None:
+            self._remaining = max(0.0, self._deadline - self.clock())
+            self._deadline = None
+
+    def reset(self, duration=None):
+        """Restart from `duration` (or the last duration), keeping the running state."""
+        if duration is not None:
+            self.duration = duration
+        self._remaining = float(self.duration)
+        if self._deadline is not None:
+            self._deadline = self.clock() + self._remaining
+
+    def chain(self, duration):
+        """Start the next `duration` from the deadline that just expired, not from now.
+
+        Lateness in noticing the expiry (timer overshoot, event-loop delay, a
+        slow decode) is taken out of the next period instead of piling up.
+        If even the chained deadline has passed (e.g. the machine slept), the
+        countdown restarts from now rather than expiring again at once.
+        """
+        self.duration = duration
+        self._remaining = float(duration)
+        if self._deadline is not None:
+            now = self.clock()
+            self._deadline += self._remaining
+            if self._deadline <= now:
+                self._deadline = now + self._remaining
+
+    def remaining(self):
+        """Remaining time in (fractional) seconds."""
+        if self._deadline is None:
+            return self._remaining
+        return max(0.0, self._deadline - self.clock())
+
+    def remaining_seconds(self):
+        """Remaining whole seconds as shown on the display (rounded up)."""
+        return math.ceil(self.remaining())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def ms_until_next_second(self):
+        """Milliseconds until the displayed seconds value next changes."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            return 0
+        fraction = remaining - math.floor(remaining)
+        if fraction == 0:
+            fraction = 1.0
+        # One extra millisecond so we land just past the boundary, not just before it
+        return math.ceil(fraction * 1000) + 1
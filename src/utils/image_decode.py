@@ -0,0 +1,57 @@
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QImage, QImageReader, QImageIOHandler
+
+# Decode a little larger than the widget so small window growth doesn't force a re-decode
+DECODE_HEADROOM = 1.25
+
+
+def _swaps_axes(reader):
+    """True if the reader's auto-transform rotates the image by 90 or 270 degrees."""
+    return bool(reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90)
+
+
+def source_size(path):
+    """Return the displayed size of an image from its header alone (invalid QSize if unreadable)."""
+    return image_header(path)[0]
+
+
+def image_header(path):
+    """Return (displayed size, format name) from an image's header alone (invalid QSize, "" if unreadable)."""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and _swaps_axes(reader):
+        size = size.transposed()
+    return size, bytes(reader.format()).decode("ascii", "replace")
+
+
+def covers(size, target):
+    """True if `size` is at least as large as `target` in both dimensions."""
+    return size.width() >= target.width() and size.height() >= target.height()
+
+
+def read_image(path, target_size=None):
+    """Decode an image file to a QImage (safe off the GUI thread). Returns a null QImage on failure.
+
+    With a target size, images larger than the target are decoded straight to
+    a size that fits it (keeping aspect ratio) via QImageReader.setScaledSize.
+    For JPEGs Qt applies that during DCT decoding, so the full-resolution
+    bitmap is never materialized.
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    if target_size is not None and target_size.isValid():
+        size = reader.size()
+        if size.isValid():
+            # The scaled size applies before the auto-transform rotation
+            target = target_size.transposed() if _swaps_axes(reader) else target_size
+            if size.width() > target.width() or size.height() > target.height():
+                reader.setScaledSize(size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    return image if not image.isNull() else QImage()
+
+
+def display_decode_size(widget):
+    """Return the device-pixel size worth decoding to for showing an image in `widget`."""
+    scale = widget.devicePixelRatioF() * DECODE_HEADROOM
+    return QSize(max(1, round(widget.width() * scale)), max(1, round(widget.height() * scale)))
@@ -0,0 +1,68 @@
+from utils.content_hash import hash_paths
+import os
+
+# Extensions accepted when importing, matching the file dialog filter
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# Rows inserted per executemany call during a folder import
+IMPORT_BATCH_SIZE = 500
+
+# Exact duplicates (same path, or same contents under another path) are ignored
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO images (path, collection, content_hash)
+    SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM images WHERE path = ?)
+'''
+
+
+def is_image_file(path):
+    """Return True if the path has one of the supported image extensions."""
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def iter_image_files(root, recursive=True):
+    """Yield image file paths under root, using forward slashes like QFileDialog."""
+    if recursive:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if is_image_file(name):
+                    yield os.path.join(dirpath, name).replace(os.sep, "/")
+    else:
+        with os.scandir(root) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file() and is_image_file(entry.name):
+                    yield entry.path.replace(os.sep, "/")
+
+
+def import_image_paths(conn, paths, batch_size=IMPORT_BATCH_SIZE, on_progress=None, is_cancelled=None):
+    """Hash files in parallel and insert the new ones, one transaction per executemany batch.
+
+    Paths already in the library and files whose contents are (by content
+    hash) are skipped. The write lock is only taken to insert a finished
+    batch, never while the folder is walked or files are hashed, so the
+    GUI's own writes don't wait behind a long import. If is_cancelled()
+    becomes true the import stops; batches already inserted are kept.
+    Returns (inserted, skipped).
+    """
+    inserted = skipped = 0
+    batch = []
+
+    def insert_batch():
+        nonlocal inserted, skipped
+        with conn:
+            count = conn.executemany(INSERT_SQL, batch).rowcount
+        inserted += count
+        skipped += len(batch) - count
+        if on_progress is not None:
+            on_progress(inserted)
+
+    for path, content_hash in hash_paths(paths):
+        if is_cancelled is not None and is_cancelled():
+            return inserted, skipped
+        batch.append((path, "Uncategorized", content_hash, path))
+        if len(batch) >= batch_size:
+            insert_batch()
+            batch = []
+    if batch and not (is_cancelled is not None and is_cancelled()):
+        insert_batch()
+    return inserted, skipped
@@ -0,0 +1,169 @@
+from storage import fetch_all, open_connection
+from utils.image_decode import image_header
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+# Header reads are I/O bound, so a few threads overlap the waits
+META_SCAN_THREADS = 4
+
+# Images checked per batch; each batch is written in one transaction
+META_BATCH_SIZE = 500
+
+# Values for image_ids_matching(orientation=...)
+PORTRAIT = "portrait"
+LANDSCAPE = "landscape"
+
+# The image may have been deleted since the scan read it; skip it rather than resurrect a row
+UPSERT_SQL = '''
+    INSERT OR REPLACE INTO image_meta (image_id, width, height, format, file_size, mtime, scanned_at)
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7 WHERE EXISTS (SELECT 1 FROM images WHERE id = ?1)
+'''
+
+
+def read_meta(path):
+    """Return (width, height, format, file_size, mtime) from the file's stat and header only.
+
+    Everything is None for a missing file; width/height/format are None if
+    the header can't be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None, None, None, None
+    size, image_format = image_header(path)
+    if not size.isValid():
+        return None, None, None, stat.st_size, stat.st_mtime
+    return size.width(), size.height(), image_format, stat.st_size, stat.st_mtime
+
+
+def _check(row):
+    """Return a fresh image_meta row for one image, or None if its stored one is current."""
+    image_id, path, file_size, mtime, scanned = row
+    if scanned:
+        try:
+            stat = os.stat(path)
+            current = (stat.st_size, stat.st_mtime)
+        except OSError:
+            current = (None, None)
+        if current == (file_size, mtime):
+            return None
+    return (image_id, *read_meta(path), time.time())
+
+
+def scan_image_meta(conn, on_progress=None, is_cancelled=None):
+    """Bring image_meta up to date. Returns the number of rows written.
+
+    Images without a row are read; images whose size or mtime changed since
+    the last scan are read again; everything else costs one stat.
+    """
+    rows = conn.execute('''
+        SELECT i.id, i.path, m.file_size, m.mtime, m.image_id IS NOT NULL
+        FROM images i LEFT JOIN image_meta m ON m.image_id = i.id
+        ORDER BY i.id
+    ''').fetchall()
+    written = 0
+    with ThreadPoolExecutor(max_workers=META_SCAN_THREADS, thread_name_prefix="image-meta") as pool:
+        for start in range(0, len(rows), META_BATCH_SIZE):
+            if is_cancelled is not None and is_cancelled():
+                break
+            changed = [meta for meta in pool.map(_check, rows[start:start + META_BATCH_SIZE]) if meta is not None]
+            if changed:
+                with conn:
+                    conn.executemany(UPSERT_SQL, changed)
+                written += len(changed)
+            if on_progress is not None:
+                on_progress(min(start + META_BATCH_SIZE, len(rows)))
+    return written
+
+
+class ImageMetaScanner:
+    """Runs scan_image_meta on a background thread, one pass at a time.
+
+    request() starts a pass, or queues exactly one more if a pass is already
+    running (so images imported mid-scan are picked up).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._rerun = False
+        self._stop = threading.Event()
+
+    def request(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._rerun = True
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="image-meta-scanner", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Abandon the running pass (what was written stays) and wait for the thread."""
+        self._stop.set()
+        with self._lock:
+            thread, self._rerun = self._thread, False
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        conn = open_connection()
+        try:
+            while True:
+                try:
+                    scan_image_meta(conn, is_cancelled=self._stop.is_set)
+                except Exception as e:
+                    print(f"Failed to scan image metadata: {e}")
+                with self._lock:
+                    if not self._rerun or self._stop.is_set():
+                        self._thread = None
+                        return
+                    self._rerun = False
+        finally:
+            conn.close()
+
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+
+def get_meta_scanner():
+    """Return the app-wide metadata scanner."""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = ImageMetaScanner()
+    return _scanner
+
+
+def stop_meta_scanner():
+    """Stop a running scan (called on application exit)."""
+    if _scanner is not None:
+        _scanner.stop()
+
+
+def image_ids_matching(orientation=None, min_short_edge=None, min_file_size=None):
+    """Ids of scanned images passing every given filter, in id order.
+
+    orientation is PORTRAIT or LANDSCAPE; min_short_edge is in pixels (both
+    sides at least that long); min_file_size is in bytes. Each condition is
+    written exactly as its index in image_meta expects.
+    """
+    conditions, params = [], []
+    if orientation == PORTRAIT:
+        conditions.append("height > width")
+    elif orientation == LANDSCAPE:
+        conditions.append("width > height")
+    if min_short_edge is not None:
+        conditions.append("min(width, height) >= ?")
+        params.append(min_short_edge)
+    if min_file_size is not None:
+        conditions.append("file_size >= ?")
+        params.append(min_file_size)
+    where = " AND ".join(conditions) or "1"
+    # Sorted here: ORDER BY image_id would make SQLite walk the table in rowid order instead
+    rows = fetch_all(f"SELECT image_id FROM image_meta WHERE {where}", params)
+    return sorted(image_id for (image_id,) in rows)
@@ -0,0 +1,98 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt6.QtGui import QImage
+from utils.image_decode import read_image, covers
+
+# Decoder threads; large decodes are memory-bound, so a couple is plenty
+PREFETCH_THREADS = 2
+
+# How many upcoming images the players keep decoded ahead of the current one
+PREFETCH_AHEAD = 3
+
+
+class _DecodeSignals(QObject):
+    decoded = pyqtSignal(str, QImage, QSize)
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, path, target_size, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.target_size = target_size
+        self.signals = signals
+
+    def run(self):
+        self.signals.decoded.emit(self.path, read_image(self.path, self.target_size), self.target_size)
+
+
+class ImagePrefetcher(QObject):
+    """Decodes the images a player is about to show on worker threads.
+
+    The player calls prefetch() with the paths it expects next (in order of
+    need) after every transition; take() then returns the decoded QImage on a
+    hit. Images are decoded to the current target size, and only the paths
+    from the latest prefetch() call are kept in memory.
+    """
+
+    def __init__(self, target_size=None, parent=None):
+        super().__init__(parent)
+        self.target_size = target_size if target_size is not None else QSize()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(PREFETCH_THREADS)
+        self._signals = _DecodeSignals()
+        self._signals.decoded.connect(self._on_decoded)
+        self._ready = {}  # path -> (image, size it was decoded for)
+        self._pending = {}  # path -> task
+        self._wanted = set()
+
+    def set_target_size(self, target_size):
+        """Decode future images to fit `target_size`; smaller prefetched images become misses."""
+        self.target_size = target_size
+
+    def _is_sufficient(self, decoded_for):
+        return not self.target_size.isValid() or (decoded_for.isValid() and covers(decoded_for, self.target_size))
+
+    def prefetch(self, paths):
+        """Keep or start decoding `paths`, most urgent first, and drop everything else."""
+        self._wanted = set(paths)
+        for path in list(self._ready):
+            if path not in self._wanted or not self._is_sufficient(self._ready[path][1]):
+                del self._ready[path]
+        for path, task in list(self._pending.items()):
+            if path not in self._wanted and self.pool.tryTake(task):
+                del self._pending[path]
+
+        # Earlier paths get higher priority so the very next image decodes first
+        for priority, path in enumerate(reversed(paths)):
+            if path in self._ready:
+                continue
+            task = self._pending.get(path)
+            if task is not None and self._is_sufficient(task.target_size):
+                if not self.pool.tryTake(task):
+                    continue  # Already running
+            else:
+                if task is not None:
+                    self.pool.tryTake(task)
+                task = _DecodeTask(path, self.target_size, self._signals)
+                self._pending[path] = task
+            self.pool.start(task, priority)
+
+    def take(self, path):
+        """Return the decoded image for `path` if it's ready at the current target size, else None."""
+        entry = self._ready.get(path)
+        if entry is None or not self._is_sufficient(entry[1]):
+            return None
+        return entry[0]
+
+    def clear(self):
+        self.pool.clear()
+        self._pending.clear()
+        self._ready.clear()
+        self._wanted = set()
+
+    def _on_decoded(self, path, image, decoded_for):
+        task = self._pending.get(path)
+        if task is not None and task.target_size == decoded_for:
+            del self._pending[path]
+        if path in self._wanted and not image.isNull():
+            self._ready[path] = (image, decoded_for)
@@ -0,0 +1,21 @@
+from storage import fetch_all
+
+# Images drawn for a sampled session unless the user picks another number
+DEFAULT_SAMPLE_SIZE = 40
+
+
+def sample_image_ids(count, collection_id=None):
+    """Draw up to `count` random image ids inside SQLite, without reading any paths.
+
+    SQLite keeps only the `count` best random keys while it scans, so memory
+    stays O(count) however large the library is. collection_id=None samples
+    from every image ("All").
+    """
+    if collection_id is None:
+        rows = fetch_all("SELECT id FROM images ORDER BY random() LIMIT ?", (count,))
+    else:
+        rows = fetch_all(
+            "SELECT image_id FROM collection_images WHERE collection_id = ? ORDER BY random() LIMIT ?",
+            (collection_id, count),
+        )
+    return [image_id for (image_id,) in rows]
@@ -0,0 +1,240 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+from utils.thumbnail_cache import get_thumbnail_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from itertools import combinations
+from operator import and_, or_
+import os
+
+try:
+    import numpy as np
+except ImportError:  # Optional: hashes come out the same, computed in plain Python
+    np = None
+
+# dHash compares each pixel with its right neighbour: 9x8 pixels give 8x8 = 64 bits
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+# Hashes are taken from the cached list thumbnail, never the full image
+THUMBNAIL_SIZE = 64
+
+# Hamming distances: "Group Duplicates" uses the first, "Find Similar" the second
+DUPLICATE_DISTANCE = 3
+SIMILAR_DISTANCE = 10
+
+# The index splits hashes into chunks; two hashes within distance d agree
+# exactly on some chunk when d < INDEX_CHUNKS, and within d // INDEX_CHUNKS
+# bits on some chunk in general
+INDEX_CHUNKS = 4
+CHUNK_BITS = 64 // INDEX_CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Buckets up to this size are compared pair by pair when grouping duplicates
+PAIRWISE_LIMIT = 32
+
+# Images thumbnailed and hashed per batch, and threads doing the thumbnailing
+HASH_BATCH_SIZE = 256
+HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def to_signed(value):
+    """Store a 64-bit hash in an SQLite INTEGER (signed 64-bit)."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hash_pixels(path):
+    """Return the HASH_WIDTH x HASH_HEIGHT grayscale pixels of an image as bytes, or None if unreadable."""
+    image = get_thumbnail_cache().get(path, THUMBNAIL_SIZE)
+    if image.isNull():
+        return None
+    small = image.scaled(
+        HASH_WIDTH, HASH_HEIGHT, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    bits = small.constBits()
+    bits.setsize(small.sizeInBytes())
+    data = bytes(bits)
+    stride = small.bytesPerLine()  # Rows are padded to 4 bytes
+    return b"".join(data[row * stride:row * stride + HASH_WIDTH] for row in range(HASH_HEIGHT))
+
+
+def dhash(pixel_rows):
+    """Compute the 64-bit dHash of each entry of `pixel_rows` (bytes from hash_pixels), all at once."""
+    if not pixel_rows:
+        return []
+    if np is not None:
+        pixels = np.frombuffer(b"".join(pixel_rows), dtype=np.uint8).reshape(-1, HASH_HEIGHT, HASH_WIDTH)
+        bits = (pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(pixel_rows), 64)
+        return [int(value) for value in np.packbits(bits, axis=1, bitorder="little").view("<u8").ravel()]
+    hashes = []
+    for pixels in pixel_rows:
+        value = 0
+        for row in range(HASH_HEIGHT):
+            offset = row * HASH_WIDTH
+            for col in range(HASH_WIDTH - 1):
+                if pixels[offset + col + 1] > pixels[offset + col]:
+                    value |= 1 << (row * (HASH_WIDTH - 1) + col)
+        hashes.append(value)
+    return hashes
+
+
+def hash_pending_images(conn, on_progress=None, is_cancelled=None):
+    """Compute perceptual hashes for every image that lacks one. Returns how many were hashed.
+
+    Thumbnails are produced on a small thread pool and each batch is hashed
+    in one vectorized pass. Unreadable images stay NULL and are retried next time.
+    """
+    rows = conn.execute("SELECT id, path FROM images WHERE perceptual_hash IS NULL ORDER BY id").fetchall()
+    hashed = 0
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="perceptual-hash") as pool:
+        for start in range(0, len(rows), HASH_BATCH_SIZE):
+            if is_cancelled is not None and is_cancelled():
+                break
+            batch = rows[start:start + HASH_BATCH_SIZE]
+            readable = [(image_id, pixels) for (image_id, _), pixels
+                        in zip(batch, pool.map(hash_pixels, [path for _, path in batch])) if pixels is not None]
+            values = dhash([pixels for _, pixels in readable])
+            with conn:
+                conn.executemany(
+                    "UPDATE images SET perceptual_hash = ? WHERE id = ?",
+                    [(to_signed(value), image_id) for (image_id, _), value in zip(readable, values)],
+                )
+            hashed += len(readable)
+            if on_progress is not None:
+                on_progress(start + len(batch))
+    return hashed
+
+
+def _flip_masks(bits):
+    """Every CHUNK_BITS-wide mask with at most `bits` bits set."""
+    masks = [0]
+    for count in range(1, bits + 1):
+        masks.extend(sum(1 << b for b in positions) for positions in combinations(range(CHUNK_BITS), count))
+    return masks
+
+
+class HammingIndex:
+    """Multi-index hashing over 64-bit perceptual hashes.
+
+    Each hash is filed under each of its INDEX_CHUNKS chunks. A query only
+    looks at buckets within distance // INDEX_CHUNKS of its own chunks
+    (pigeonhole principle) and checks those candidates exactly, so it
+    touches a few hundred entries rather than the whole library.
+    """
+
+    def __init__(self, items=()):
+        self.hashes = {}  # image_id -> hash
+        self.tables = [defaultdict(list) for _ in range(INDEX_CHUNKS)]
+        for image_id, value in items:
+            self.add(image_id, value)
+
+    @classmethod
+    def load(cls, conn):
+        """Index every hashed image in the library."""
+        rows = conn.execute("SELECT id, perceptual_hash FROM images WHERE perceptual_hash IS NOT NULL")
+        return cls((image_id, to_unsigned(value)) for image_id, value in rows)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, image_id, value):
+        self.hashes[image_id] = value
+        for chunk, table in enumerate(self.tables):
+            table[(value >> (chunk * CHUNK_BITS)) & CHUNK_MASK].append(image_id)
+
+    def query(self, value, max_distance=SIMILAR_DISTANCE):
+        """Return [(distance, image_id)] for hashes within `max_distance` of `value`, closest first."""
+        masks = _flip_masks(max_distance // INDEX_CHUNKS)
+        candidates = set()
+        for chunk, table in enumerate(self.tables):
+            key = (value >> (chunk * CHUNK_BITS)) & CHUNK_MASK
+            for mask in masks:
+                bucket = table.get(key ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+        matches = []
+        for image_id in candidates:
+            distance = (self.hashes[image_id] ^ value).bit_count()
+            if distance <= max_distance:
+                matches.append((distance, image_id))
+        matches.sort()
+        return matches
+
+    def duplicate_groups(self, max_distance=DUPLICATE_DISTANCE):
+        """Group images whose hashes are within `max_distance` (transitively), largest groups first.
+
+        Needs max_distance < INDEX_CHUNKS. Identical hashes are grouped
+        directly; distinct ones are split into buckets by _link_close, so
+        skewed hashes (e.g. many flat backgrounds sharing a chunk) don't
+        turn one big bucket into a quadratic comparison.
+        """
+        if max_distance >= INDEX_CHUNKS:
+            raise ValueError(f"duplicate grouping supports distances below {INDEX_CHUNKS}")
+        by_value = defaultdict(list)
+        for image_id, value in self.hashes.items():
+            by_value[value].append(image_id)
+        parent = {}
+
+        def find(value):
+            root = value
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while value != root:
+                parent[value], value = root, parent.get(value, value)
+            return root
+
+        def link(a, b):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        _link_close(list(by_value), list(range(64)), max_distance, link)
+
+        groups = defaultdict(list)
+        for value, image_ids in by_value.items():
+            groups[find(value)].extend(image_ids)
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1), key=lambda group: (-len(group), group[0])
+        )
+
+
+def _link_close(values, free_bits, max_distance, link):
+    """Call link(a, b) for pairs of distinct `values` within `max_distance` bits (at least once per pair).
+
+    All values agree outside the bit positions in `free_bits`. Splitting
+    those into max_distance + 1 parts, a close pair agrees exactly on one
+    part (pigeonhole), so values are bucketed by each part in turn and only
+    buckets are searched, recursing on the bits the bucket still leaves free.
+    """
+    if len(values) < 2:
+        return
+    if len(values) > PAIRWISE_LIMIT:
+        # Bits every value shares can't tell them apart; splitting on them only repeats the bucket
+        varying = reduce(or_, values) ^ reduce(and_, values)
+        free_bits = [bit for bit in free_bits if varying >> bit & 1]
+    if len(free_bits) <= max_distance:
+        # Can't differ in more bits than are free: everything is close
+        for value in values[1:]:
+            link(values[0], value)
+        return
+    if len(values) <= PAIRWISE_LIMIT:
+        for a, b in combinations(values, 2):
+            if (a ^ b).bit_count() <= max_distance:
+                link(a, b)
+        return
+    parts = max_distance + 1
+    bounds = [len(free_bits) * i // parts for i in range(parts + 1)]
+    for start, stop in zip(bounds, bounds[1:]):
+        mask = sum(1 << bit for bit in free_bits[start:stop])
+        buckets = defaultdict(list)
+        for value in values:
+            buckets[value & mask].append(value)
+        rest = free_bits[:start] + free_bits[stop:]
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                _link_close(bucket, rest, max_distance, link)
@@ -0,0 +1,77 @@
+from PyQt6.QtGui import QPixmap
+from utils.thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from storage import get_setting
+from collections import OrderedDict
+
+# Default in-memory ceiling, overridable with the "pixmap_cache_bytes" setting
+DEFAULT_BUDGET_BYTES = 128 * 1024 * 1024
+
+
+def pixmap_bytes(pixmap):
+    """Approximate memory held by a pixmap."""
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """App-wide LRU of decoded preview pixmaps with a byte ceiling.
+
+    Keys are (image id, target size). Callers that only know a path (the
+    ordering windows) pass image_id=None and the path stands in for the id.
+    Each entry remembers the file's mtime and size (the thumbnail cache key),
+    so an edited file is decoded again instead of served stale. Misses are
+    filled from the on-disk thumbnail cache. GUI thread only.
+    """
+
+    def __init__(self, budget_bytes=None):
+        if budget_bytes is None:
+            budget_bytes = int(get_setting("pixmap_cache_bytes", DEFAULT_BUDGET_BYTES))
+        self.budget_bytes = budget_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, path, size, image_id=None):
+        """Return a pixmap of `path` fitting size x size; null if the file can't be read."""
+        key = (image_id if image_id is not None and image_id >= 0 else path, size)
+        stamp = ThumbnailCache.make_key(path, size)  # One stat; changes when the file is edited
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] == stamp:
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.total_bytes -= pixmap_bytes(self._entries.pop(key)[1])
+
+        image = get_thumbnail_cache().get(path, size)
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull() and stamp is not None:
+            self._store(key, stamp, pixmap)
+        return pixmap
+
+    def _store(self, key, stamp, pixmap):
+        cost = pixmap_bytes(pixmap)
+        if cost > self.budget_bytes:
+            return
+        self._entries[key] = (stamp, pixmap)
+        self.total_bytes += cost
+        while self.total_bytes > self.budget_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.total_bytes -= pixmap_bytes(evicted)
+
+    def invalidate(self, image_id):
+        """Forget every cached size of an image (e.g. after it is deleted)."""
+        for key in [key for key in self._entries if key[0] == image_id]:
+            self.total_bytes -= pixmap_bytes(self._entries.pop(key)[1])
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+
+_pixmap_cache = None
+
+
+def get_pixmap_cache():
+    """Return the pixmap cache shared by every window."""
+    global _pixmap_cache
+    if _pixmap_cache is None:
+        _pixmap_cache = PixmapCache()
+    return _pixmap_cache
@@ -0,0 +1,272 @@
+from utils.countdown import Countdown
+from utils.session_timeline import SessionTimeline
+from utils.session_utils import Segment, SessionPlan
+from utils.playlist import Playlist
+from utils.shuffle_scheduler import ShuffleScheduler
+from collections import namedtuple
+import random
+import time
+
+# Events passed to subscribers as callback(event, engine)
+SLOT_CHANGED = "slot_changed"  # Moved to another slot (timeout, skip, Back or a jump)
+SOFT_SKIPPED = "soft_skipped"  # Next image shown without consuming a slot
+COUNTDOWN_RESET = "countdown_reset"  # Same slot, countdown restarted
+STARTED = "started"
+PAUSED = "paused"
+DISPLAY_ENDED = "display_ended"  # An image left the screen; details in engine.last_display
+
+# How an image's display ended (Display.ended_by)
+ENDED_TIMEOUT = "timeout"
+ENDED_SKIP = "skip"
+ENDED_SOFT_SKIP = "soft_skip"
+ENDED_BACK = "back"
+ENDED_CLOSED = "closed"
+
+# One image's time on screen. actual_seconds only counts time while running.
+Display = namedtuple("Display", ["image_id", "slot", "planned_seconds", "actual_seconds", "ended_by"])
+
+
+def fixed_plan(seconds):
+    """Plan for fixed-time mode: every image is shown for `seconds` (at least 1)."""
+    if seconds < 1:
+        raise ValueError("Images must be shown for at least 1 second.")
+    return SessionPlan([Segment(1, seconds, "seconds", False)])
+
+
+class ManualClock:
+    """Clock that only moves when told to, for simulations and benchmarks."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class PlaybackEngine:
+    """Playback state shared by the fixed-time and session players, with no UI.
+
+    Combines a Playlist, a compiled session plan and a countdown on an
+    injectable clock. The windows call start/pause/next/previous/soft_skip/tick
+    and re-render from the current state when an event is published.
+    """
+
+    def __init__(self, playlist, plan, shuffle=False, clock=time.monotonic, rng=None, recent=(), history=None):
+        if not playlist:
+            raise ValueError("There are no images to play.")
+        self.plan = plan
+        self.timeline = SessionTimeline(plan.timings())
+        self.shuffle = shuffle
+        self.rng = rng or random.Random()
+        # Never copied; paths are only looked up for the images that get shown
+        self.playlist = playlist
+
+        # Shuffling permutes indices, not paths. Each pass through the collection
+        # keeps its own order so Back across a wrap-around is exact; `recent`
+        # (positions shown in earlier sessions) go to the end of the first pass.
+        self.scheduler = ShuffleScheduler(len(playlist), self.rng, recent) if shuffle else None
+        self.history = history  # utils.shuffle_scheduler.ShownHistory, if shown images are remembered
+
+        self.current_slot = 0
+        self.slot_state = self.timeline.slot(0)
+        self.image_offset = 0  # Images advanced by soft skips, which don't consume slots
+        self.clock = clock
+        self.countdown = Countdown(self.slot_state.duration, clock)
+        self._subscribers = []
+        self.last_display = None
+        self._closed = False
+        self._begin_display()
+
+    # Events
+
+    def subscribe(self, callback):
+        """Call `callback(event, engine)` whenever the playback state changes."""
+        self._subscribers.append(callback)
+
+    def _publish(self, event):
+        for callback in self._subscribers:
+            callback(event, self)
+
+    # Clock
+
+    @property
+    def running(self):
+        return self.countdown.running
+
+    def start(self):
+        if not self._closed and not self.running:
+            self.countdown.start()
+            self._display_resumed = self.clock()
+            self._publish(STARTED)
+
+    def pause(self):
+        if self.running:
+            self.countdown.pause()
+            self._display_elapsed += self.clock() - self._display_resumed
+            self._display_resumed = None
+            self._publish(PAUSED)
+
+    def reset_countdown(self):
+        """Restart the current slot's countdown from its full duration."""
+        self.countdown.reset(self.slot_state.duration)
+        self._publish(COUNTDOWN_RESET)
+
+    def tick(self):
+        """Advance to the next slot if the countdown ran out; returns True if it did."""
+        if not self._closed and self.running and self.countdown.expired():
+            self.next(ENDED_TIMEOUT)
+            return True
+        return False
+
+    # Navigation
+
+    def go_to(self, slot, reason=ENDED_SKIP):
+        """Jump to any slot of the session; the timing state comes straight from the timeline.
+
+        Does nothing once the engine is closed.
+        """
+        if self._closed:
+            return
+        self._end_display(reason)
+        self.current_slot = slot
+        self.slot_state = self.timeline.slot(slot)
+        if reason == ENDED_TIMEOUT:
+            # Chained from the expired deadline so a long session doesn't drift
+            self.countdown.chain(self.slot_state.duration)
+        else:
+            self.countdown.reset(self.slot_state.duration)
+        self._begin_display()
+        self._publish(SLOT_CHANGED)
+
+    def next(self, reason=ENDED_SKIP):
+        self.go_to(self.current_slot + 1, reason)
+
+    def previous(self):
+        """Go back one slot (image or break) with the timing it had when played forward."""
+        if not self._closed and self.can_go_back():
+            self.go_to(self.current_slot - 1, ENDED_BACK)
+
+    def can_go_back(self):
+        return self.current_slot > 0
+
+    def soft_skip(self):
+        """Show the next image but keep the current slot's timing; no-op during a break."""
+        if not self._closed and not self.slot_state.is_break:
+            self._end_display(ENDED_SOFT_SKIP)
+            self.image_offset += 1
+            self.countdown.reset(self.slot_state.duration)
+            self._begin_display()
+            self._publish(SOFT_SKIPPED)
+
+    # Images
+
+    @property
+    def is_break(self):
+        return self.slot_state.is_break
+
+    def pass_order(self, pass_number):
+        """Return the order images are shown in for one pass, as indices into the playlist."""
+        if self.scheduler is None:
+            return range(len(self.playlist))
+        return self.scheduler.pass_order(pass_number)
+
+    def playlist_index_for_slot(self, slot):
+        """Return the playlist position shown at `slot`, taking soft skips into account."""
+        ordinal = self.timeline.slot(slot).image_ordinal + self.image_offset
+        pass_number, index = divmod(ordinal, len(self.playlist))
+        return self.pass_order(pass_number)[index]
+
+    def image_path_for_slot(self, slot):
+        return self.playlist[self.playlist_index_for_slot(slot)]
+
+    def image_id_for_slot(self, slot):
+        return self.playlist.image_id(self.playlist_index_for_slot(slot))
+
+    def current_image_path(self):
+        """Path of the image on screen, or None during a break."""
+        if self.slot_state.is_break:
+            return None
+        return self.image_path_for_slot(self.current_slot)
+
+    def upcoming_image_paths(self, count):
+        """Return the paths of the next `count` images to be shown, following the session's breaks."""
+        paths = []
+        slot = self.current_slot
+        # Bounded in case the plan is all breaks
+        for _ in range(count * (len(self.timeline) + 1)):
+            if len(paths) >= count:
+                break
+            slot += 1
+            if not self.timeline.is_break(slot):
+                paths.append(self.image_path_for_slot(slot))
+        return paths
+
+    # Display tracking
+
+    def _begin_display(self):
+        self._display_elapsed = 0.0
+        self._display_resumed = self.clock() if self.running else None
+        if self.history is not None and not self._closed and not self.slot_state.is_break:
+            self.history.mark(self.image_id_for_slot(self.current_slot))
+
+    def _end_display(self, reason):
+        if self.slot_state.is_break:
+            return
+        elapsed = self._display_elapsed
+        if self._display_resumed is not None:
+            elapsed += self.clock() - self._display_resumed
+        self.last_display = Display(
+            image_id=self.image_id_for_slot(self.current_slot),
+            slot=self.current_slot,
+            planned_seconds=self.slot_state.duration,
+            actual_seconds=elapsed,
+            ended_by=reason,
+        )
+        self._publish(DISPLAY_ENDED)
+
+    def close(self):
+        """End playback: stop the countdown, report the image on screen and save what was shown.
+
+        Nothing moves after this, so the saved history matches what was on screen.
+        """
+        if self._closed:
+            return
+        self.pause()
+        self._closed = True
+        self._end_display(ENDED_CLOSED)
+        if self.history is not None:
+            self.history.flush()
+
+    def prefetch_paths(self, ahead):
+        """Images worth decoding ahead of time: the next `ahead` and the previous one (for Back)."""
+        paths = self.upcoming_image_paths(ahead)
+        if self.current_slot > 0 and not self.timeline.is_break(self.current_slot - 1):
+            paths.append(self.image_path_for_slot(self.current_slot - 1))
+        return paths
+
+
+def simulate(images, plan, slots, shuffle=False, seed=None):
+    """Play `slots` slots to completion on a manual clock, with no UI.
+
+    `images` is a Playlist or a plain list of paths. Returns the (slot, image path or None, duration) sequence that was shown,
+    for benchmarks and regression checks.
+    """
+    clock = ManualClock()
+    if not isinstance(images, Playlist):
+        images = Playlist.from_paths(images)
+    engine = PlaybackEngine(images, plan, shuffle, clock, random.Random(seed))
+    shown = [(0, engine.current_image_path(), engine.slot_state.duration)]
+
+    def record(event, engine):
+        if event == SLOT_CHANGED:
+            shown.append((engine.current_slot, engine.current_image_path(), engine.slot_state.duration))
+
+    engine.subscribe(record)
+    engine.start()
+    while engine.current_slot < slots - 1:
+        clock.advance(engine.countdown.remaining())
+        engine.tick()
+    return shown
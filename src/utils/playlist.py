@@ -0,0 +1,99 @@
+from storage import fetch_all
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+# Paths kept in memory per playlist; playback and the ordering list only touch a window of them
+PATH_CACHE_SIZE = 1024
+
+# Collection id the UI uses for "All"
+ALL_COLLECTION_ID = -1
+
+# Ids resolved per query (well under SQLite's bound-parameter limit)
+PATH_BATCH_SIZE = 500
+
+
+def collection_image_ids(collection_id=None):
+    """Ids of every image in a collection (collection_id=None for "All"), without loading paths."""
+    if collection_id is None:
+        rows = fetch_all("SELECT id FROM images ORDER BY id")
+    else:
+        rows = fetch_all("SELECT image_id FROM collection_images WHERE collection_id = ? ORDER BY id", (collection_id,))
+    return array('I', (image_id for (image_id,) in rows))
+
+
+class _PathLookup:
+    """Image id -> path, filled lazily from the images table in batches and bounded by an LRU."""
+
+    def __init__(self, known_paths=None):
+        self.known = dict(known_paths or {})  # Supplied up front, never evicted
+        self.cache = OrderedDict()
+
+    def get(self, image_id):
+        return self.get_many([image_id])[0]
+
+    def get_many(self, image_ids):
+        missing = [i for i in dict.fromkeys(image_ids) if i not in self.known and i not in self.cache]
+        for start in range(0, len(missing), PATH_BATCH_SIZE):
+            batch = missing[start:start + PATH_BATCH_SIZE]
+            found = dict(fetch_all(
+                f"SELECT id, path FROM images WHERE id IN ({','.join('?' * len(batch))})", batch
+            ))
+            for image_id in batch:
+                # Deleted since the playlist was built; shows up as an unreadable image
+                self.cache[image_id] = found.get(image_id, "")
+
+        paths = []
+        for image_id in image_ids:
+            path = self.known.get(image_id)
+            if path is None:
+                path = self.cache[image_id]
+                self.cache.move_to_end(image_id)
+            paths.append(path)
+        while len(self.cache) > max(PATH_CACHE_SIZE, len(image_ids)):
+            self.cache.popitem(last=False)
+        return paths
+
+
+class Playlist(Sequence):
+    """The images a player goes through, as a compact array('I') of image ids.
+
+    Indexing returns paths, looked up on demand. Orders are expressed as new
+    id arrays (reordered) or index permutations (the engine's shuffle), so
+    the same playlist and path lookup pass from the ordering windows to the
+    players without copying any paths.
+    """
+
+    def __init__(self, image_ids, collection_id=None, known_paths=None, _lookup=None):
+        self.collection_id = collection_id  # Where the images came from (-1 for "All"); None if nowhere
+        self.image_ids = image_ids if isinstance(image_ids, array) and image_ids.typecode == 'I' else array('I', image_ids)
+        self._lookup = _lookup if _lookup is not None else _PathLookup(known_paths)
+
+    @classmethod
+    def from_collection(cls, collection_id):
+        """Every image in a collection, or in the library for ALL_COLLECTION_ID."""
+        return cls(collection_image_ids(None if collection_id == ALL_COLLECTION_ID else collection_id), collection_id)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Playlist over plain paths with no database behind it (ids are list positions)."""
+        return cls(range(len(paths)), known_paths=enumerate(paths))
+
+    def __len__(self):
+        return len(self.image_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._lookup.get_many(self.image_ids[index])
+        return self._lookup.get(self.image_ids[index])
+
+    def image_id(self, index):
+        return self.image_ids[index]
+
+    def paths(self, start, stop):
+        """Paths for positions start..stop-1, resolved in one batch."""
+        return self._lookup.get_many(self.image_ids[start:stop])
+
+    def reordered(self, image_ids):
+        """A playlist over `image_ids` sharing this one's path lookup."""
+        return Playlist(image_ids, self.collection_id, _lookup=self._lookup)
@@ -0,0 +1,146 @@
+from storage import open_connection, execute
+from utils.playback_engine import DISPLAY_ENDED, ENDED_SKIP, ENDED_SOFT_SKIP, ENDED_BACK
+import queue
+import threading
+import time
+
+# Rows written per transaction at most, and the longest a row waits in memory
+FLUSH_BATCH_SIZE = 256
+FLUSH_INTERVAL = 2.0
+
+INSERT_SQL = '''
+    INSERT INTO practice_log (
+        session_id, image_id, collection_id, ended_at,
+        planned_seconds, actual_seconds, skipped, soft_skipped, went_back
+    ) VALUES (?, (SELECT id FROM images WHERE id = ?), ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Values of practice_sessions.mode
+MODE_FIXED = "fixed"
+MODE_SESSION = "session"
+
+_STOP = object()
+
+
+class PracticeLogWriter:
+    """Write-behind buffer for practice_log rows.
+
+    append() only puts the row on a queue, so it costs the UI thread next to
+    nothing. A background thread with its own connection drains the queue and
+    writes rows in batches, at least every FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="practice-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, row):
+        self._queue.put(row)
+
+    def flush(self, timeout=None):
+        """Block until everything appended so far has been written."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write what's left and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        conn = open_connection()
+        try:
+            stopping = False
+            while not stopping:
+                rows, waiters = [], []
+                deadline = None
+                while len(rows) < FLUSH_BATCH_SIZE:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    if isinstance(item, threading.Event):
+                        waiters.append(item)
+                        break
+                    rows.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + FLUSH_INTERVAL
+                if rows:
+                    self._write(conn, rows)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            conn.close()
+
+    def _write(self, conn, rows):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, rows)
+        except Exception as e:
+            print(f"Failed to write practice log: {e}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_practice_log():
+    """Return the app-wide practice log writer, starting it on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = PracticeLogWriter()
+    return _writer
+
+
+def close_practice_log():
+    """Flush and stop the writer (called on application exit)."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def start_practice_session(mode, collection_id, plan):
+    """Record the start of a practice session and return its id."""
+    cursor = execute(
+        "INSERT INTO practice_sessions (mode, collection_id, plan, started_at) VALUES (?, ?, ?, ?)",
+        (mode, collection_id, plan.to_string(), time.time()),
+    )
+    return cursor.lastrowid
+
+
+class PracticeRecorder:
+    """Turns a PlaybackEngine's DISPLAY_ENDED events into practice_log rows."""
+
+    def __init__(self, engine, mode, writer=None):
+        self.collection_id = engine.playlist.collection_id
+        self.session_id = start_practice_session(mode, self.collection_id, engine.plan)
+        self.writer = writer or get_practice_log()
+        engine.subscribe(self.on_playback_event)
+
+    def on_playback_event(self, event, engine):
+        if event != DISPLAY_ENDED:
+            return
+        display = engine.last_display
+        if display.actual_seconds <= 0:
+            return  # Never on screen while the timer was running
+        self.writer.append((
+            self.session_id,
+            display.image_id,
+            self.collection_id,
+            time.time(),
+            display.planned_seconds,
+            display.actual_seconds,
+            int(display.ended_by == ENDED_SKIP),
+            int(display.ended_by == ENDED_SOFT_SKIP),
+            int(display.ended_by == ENDED_BACK),
+        ))
@@ -0,0 +1,90 @@
+from storage import fetch_all, fetch_one
+
+# Rows shown per list in the statistics window
+STATS_LIST_LIMIT = 20
+
+# All queries below read the rollup tables kept by the practice_log_rollup
+# trigger; none of them touch practice_log itself.
+
+
+def format_seconds(seconds):
+    """Format a duration like "2h 05m", "4m 30s" or "45s"."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02}m"
+    if minutes:
+        return f"{minutes}m {secs:02}s"
+    return f"{secs}s"
+
+
+def totals():
+    """Return (seconds, images) practiced overall."""
+    row = fetch_one("SELECT coalesce(sum(seconds), 0), coalesce(sum(images), 0) FROM practice_daily")
+    return row[0], row[1]
+
+
+def totals_since(day):
+    """Return (seconds, images) practiced on or after `day` (YYYY-MM-DD, local time)."""
+    row = fetch_one(
+        "SELECT coalesce(sum(seconds), 0), coalesce(sum(images), 0) FROM practice_daily WHERE day >= ?", (day,)
+    )
+    return row[0], row[1]
+
+
+def daily_totals(days=30):
+    """Return (day, seconds, images) for the most recent days with practice, newest first."""
+    return fetch_all("SELECT day, seconds, images FROM practice_daily ORDER BY day DESC LIMIT ?", (days,))
+
+
+def weekly_totals(weeks=12):
+    """Return (week start, seconds, images) for recent weeks (starting Monday), newest first."""
+    return fetch_all('''
+        SELECT date(day, '-6 days', 'weekday 1') AS week, sum(seconds), sum(images)
+        FROM practice_daily
+        GROUP BY week
+        ORDER BY week DESC
+        LIMIT ?
+    ''', (weeks,))
+
+
+def collection_totals():
+    """Return (collection name, seconds, images) per collection, most practiced first."""
+    return fetch_all('''
+        SELECT CASE WHEN t.collection_id = -1 THEN 'All' ELSE coalesce(c.name, 'Deleted collection') END,
+               t.seconds, t.images
+        FROM practice_collection_totals t
+        LEFT JOIN collections c ON c.id = t.collection_id
+        ORDER BY t.seconds DESC
+    ''')
+
+
+def most_shown_images(limit=STATS_LIST_LIMIT):
+    """Return (image_id, path, shown, seconds) for the most shown images."""
+    return fetch_all('''
+        SELECT t.image_id, i.path, t.shown, t.seconds
+        FROM practice_image_totals t
+        JOIN images i ON i.id = t.image_id
+        ORDER BY t.shown DESC, t.seconds DESC
+        LIMIT ?
+    ''', (limit,))
+
+
+def least_shown_images(limit=STATS_LIST_LIMIT):
+    """Return (image_id, path, shown, seconds) for the least shown images, never-shown ones first."""
+    rows = fetch_all('''
+        SELECT i.id, i.path, 0, 0
+        FROM images i
+        WHERE NOT EXISTS (SELECT 1 FROM practice_image_totals t WHERE t.image_id = i.id)
+        LIMIT ?
+    ''', (limit,))
+    if len(rows) < limit:
+        rows += fetch_all('''
+            SELECT t.image_id, i.path, t.shown, t.seconds
+            FROM practice_image_totals t
+            JOIN images i ON i.id = t.image_id
+            ORDER BY t.shown ASC, t.seconds ASC
+            LIMIT ?
+        ''', (limit - len(rows),))
+    return rows
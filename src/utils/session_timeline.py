@@ -0,0 +1,82 @@
+from array import array
+from collections import namedtuple
+
+# One slot of a session: an image (or break) shown for `duration` seconds.
+# `image_ordinal` counts images shown since the session started (the image a
+# break slot carries is the one shown right after it); `start` is the slot's
+# start time in seconds from the beginning of the session.
+Slot = namedtuple("Slot", ["slot", "timing_index", "image_ordinal", "duration", "is_break", "start"])
+
+
+class SessionTimeline:
+    """A session plan compiled into an indexed, endlessly repeating list of slots.
+
+    Built once from (count, duration, is_break) timings. Per-slot durations,
+    break flags and prefix sums of start times and images shown are stored
+    in flat arrays, so looking up any slot (next, previous or an arbitrary
+    jump) is O(1) and gives exactly the state playing forward would reach.
+    """
+
+    def __init__(self, timings):
+        if not timings:
+            raise ValueError("A session needs at least one segment.")
+        self.timings = timings
+        self._timing_index = array('I')
+        self._durations = array('I')
+        self._breaks = bytearray()
+        self._active_before = array('Q')  # Images shown before each slot within one cycle
+        self._starts = array('Q')  # Start time of each slot within one cycle
+
+        active = 0
+        elapsed = 0
+        for timing_index, (count, duration, is_break) in enumerate(timings):
+            # A zero-length slot would expire as soon as it starts and spin the player
+            if duration < 1:
+                raise ValueError("Every slot must last at least 1 second.")
+            for _ in range(count):
+                self._timing_index.append(timing_index)
+                self._durations.append(duration)
+                self._breaks.append(1 if is_break else 0)
+                self._active_before.append(active)
+                self._starts.append(elapsed)
+                if not is_break:
+                    active += 1
+                elapsed += duration
+        if not self._durations:
+            raise ValueError("A session needs at least one slot.")
+
+        self.slots_per_cycle = len(self._durations)
+        self.images_per_cycle = active
+        self.cycle_duration = elapsed
+
+    def __len__(self):
+        return self.slots_per_cycle
+
+    def slot(self, n):
+        """Return the state of global slot `n` (counting from 0, across repeats of the plan)."""
+        if n < 0:
+            raise IndexError("Slot numbers start at 0.")
+        cycle, position = divmod(n, self.slots_per_cycle)
+        return Slot(
+            slot=n,
+            timing_index=self._timing_index[position],
+            image_ordinal=cycle * self.images_per_cycle + self._active_before[position],
+            duration=self._durations[position],
+            is_break=bool(self._breaks[position]),
+            start=cycle * self.cycle_duration + self._starts[position],
+        )
+
+    def is_break(self, n):
+        return bool(self._breaks[n % self.slots_per_cycle])
+
+    def slot_at_time(self, seconds):
+        """Return the slot number playing `seconds` into the session (binary search on start times)."""
+        cycle, offset = divmod(int(seconds), self.cycle_duration) if self.cycle_duration else (0, 0)
+        low, high = 0, self.slots_per_cycle - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._starts[middle] <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        return cycle * self.slots_per_cycle + low
@@ -1,32 +1,201 @@
-def parse_session_duration(duration_str):
-    """Parse session duration string into structured data."""
-    # Remove the session name if it's included
-    if ": " in duration_str:
-        duration_str = duration_str.split(": ", 1)[1]  # Get everything after ": "
+from storage import fetch_all, execute, execute_many
+from collections import namedtuple
+from functools import lru_cache
+import json
+import re
 
-    segments = []
-    for segment in duration_str.split(" + "):
-        parts = segment.split("x")
-        if len(parts) != 2:
-            continue
-        try:
-            count = int(parts[0])
-            duration_unit = parts[1].strip()
-            segment_type = "active"
+# Grammar for session duration strings, e.g. "2x30sec + 1x5min break + 4x1min":
+#
+#   plan     := segment ("+" segment)*
+#   segment  := NUMBER "x" NUMBER UNIT ["break"]
+#   UNIT     := "sec" | "secs" | "seconds" | "min" | "mins" | "minutes"
+#
+# Whitespace between tokens is optional and matching is case-insensitive. An
+# optional "name: " prefix (as shown in the session combo box) is ignored.
+
+Segment = namedtuple("Segment", ["count", "seconds", "unit", "is_break"])
+
+UNIT_SECONDS = {"sec": ("seconds", 1), "secs": ("seconds", 1), "seconds": ("seconds", 1),
+                "min": ("minutes", 60), "mins": ("minutes", 60), "minutes": ("minutes", 60)}
+
+PLAN_FORMAT_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\s*(?:(?P<number>\d+)|(?P<word>[A-Za-z]+)|(?P<plus>\+))")
+
+
+class SessionParseError(ValueError):
+    """Raised for malformed session duration strings; `position` is the character offset."""
+
+    def __init__(self, message, text, position):
+        super().__init__(f"{message} at position {position + 1} in '{text}'")
+        self.text = text
+        self.position = position
+
+
+def tokenize(text):
+    """Split a duration string into (kind, value, position) tokens."""
+    tokens = []
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = _TOKEN_RE.match(text, position)
+        if match is None:
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise SessionParseError(f"Unexpected character '{text[position]}'", text, position)
+        start = match.start(match.lastgroup)
+        if match.lastgroup == "number":
+            tokens.append(("number", int(match.group("number")), start))
+        elif match.lastgroup == "plus":
+            tokens.append(("plus", "+", start))
+        else:
+            # Words split at digits, so "2x30sec" lexes as 2, x, 30, sec
+            word = match.group("word").lower()
+            tokens.append(("x" if word == "x" else "word", word, start))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else ("end", None, len(self.text))
+
+    def expect(self, kind, description):
+        token = self.peek()
+        if token[0] != kind:
+            found = "end of input" if token[0] == "end" else f"'{token[1]}'"
+            raise SessionParseError(f"Expected {description}, found {found}", self.text, token[2])
+        self.index += 1
+        return token
+
+    def parse_plan(self):
+        segments = [self.parse_segment()]
+        while self.peek()[0] == "plus":
+            self.index += 1
+            segments.append(self.parse_segment())
+        token = self.peek()
+        if token[0] != "end":
+            raise SessionParseError(f"Expected '+' or end of input, found '{token[1]}'", self.text, token[2])
+        return SessionPlan(segments)
+
+    def parse_segment(self):
+        _, count, count_position = self.expect("number", "a repeat count")
+        self.expect("x", "'x'")
+        _, duration, duration_position = self.expect("number", "a duration")
+        _, unit_word, unit_position = self.expect("word", "a unit (sec or min)")
+        if unit_word not in UNIT_SECONDS:
+            raise SessionParseError(f"Unknown unit '{unit_word}'", self.text, unit_position)
+        is_break = False
+        token = self.peek()
+        if token[0] == "word" and token[1] == "break":
+            self.index += 1
+            is_break = True
+        if count < 1:
+            raise SessionParseError("Repeat count must be at least 1", self.text, count_position)
+        if duration < 1:
+            raise SessionParseError("Duration must be at least 1", self.text, duration_position)
+        unit, multiplier = UNIT_SECONDS[unit_word]
+        return Segment(count, duration * multiplier, unit, is_break)
 
-            if "break" in duration_unit:
-                segment_type = "break"
-                duration_unit = duration_unit.replace(" break", "")
 
-            if "min" in duration_unit:
-                duration = int(duration_unit.replace("min", "")) * 60
-                unit = "minutes"
+class SessionPlan:
+    """A validated session: an immutable tuple of segments."""
+    __slots__ = ("segments",)
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+
+    def __eq__(self, other):
+        return isinstance(other, SessionPlan) and self.segments == other.segments
+
+    def __hash__(self):
+        return hash(self.segments)
+
+    def __repr__(self):
+        return f"SessionPlan({self.to_string()!r})"
+
+    def timings(self):
+        """Return (count, seconds, is_break) tuples for the player and timeline."""
+        return [(s.count, s.seconds, s.is_break) for s in self.segments]
+
+    def to_string(self):
+        """Format the plan in the canonical duration syntax stored in the sessions table."""
+        parts = []
+        for s in self.segments:
+            if s.unit == "minutes":
+                text = f"{s.count}x{s.seconds // 60}min"
             else:
-                duration = int(duration_unit.replace("sec", ""))
-                unit = "seconds"
+                text = f"{s.count}x{s.seconds}sec"
+            parts.append(f"{text} break" if s.is_break else text)
+        return " + ".join(parts)
+
+    def encode(self):
+        """Serialize to the compact form cached in sessions.plan."""
+        return json.dumps({
+            "v": PLAN_FORMAT_VERSION,
+            "segments": [[s.count, s.seconds, s.unit[0], int(s.is_break)] for s in self.segments],
+        }, separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, data):
+        """Rebuild a plan from encode() output; returns None if it's missing or from another version."""
+        if not data:
+            return None
+        try:
+            payload = json.loads(data)
+            if payload.get("v") != PLAN_FORMAT_VERSION:
+                return None
+            return cls(
+                Segment(count, seconds, "minutes" if unit == "m" else "seconds", bool(is_break))
+                for count, seconds, unit, is_break in payload["segments"]
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+def strip_session_name(duration_str):
+    """Remove a leading "name: " as shown in the session combo box."""
+    if ": " in duration_str:
+        return duration_str.rpartition(": ")[2]
+    return duration_str
+
+
+@lru_cache(maxsize=128)
+def parse_session_plan(duration_str):
+    """Parse a session duration string into a SessionPlan, raising SessionParseError if invalid."""
+    return _Parser(strip_session_name(duration_str)).parse_plan()
+
+
+def load_session_plans():
+    """Return (name, duration, plan) for every saved session.
+
+    Plans are compiled once and cached in sessions.plan; rows saved before
+    that column existed are parsed here and written back. `plan` is None
+    for a duration string that doesn't parse.
+    """
+    sessions = []
+    backfill = []
+    for name, duration, plan_data in fetch_all("SELECT name, duration, plan FROM sessions ORDER BY id"):
+        plan = SessionPlan.decode(plan_data)
+        if plan is None:
+            try:
+                plan = parse_session_plan(duration)
+                backfill.append((plan.encode(), name))
+            except SessionParseError:
+                plan = None
+        sessions.append((name, duration, plan))
+    if backfill:
+        execute_many("UPDATE sessions SET plan = ? WHERE name = ?", backfill)
+    return sessions
 
-            segments.append((count, duration, unit, segment_type))
-        except ValueError:
-            print(f"Skipping invalid segment: {segment}")  # Debugging
 
-    return segments
+def save_session_plan(name, plan, update=False):
+    """Insert (or update) a named session with its duration string and compiled plan."""
+    if update:
+        execute("UPDATE sessions SET duration = ?, plan = ? WHERE name = ?", (plan.to_string(), plan.encode(), name))
+    else:
+        execute("INSERT INTO sessions (name, duration, plan) VALUES (?, ?, ?)", (name, plan.to_string(), plan.encode()))
@@ -0,0 +1,105 @@
+from storage import fetch_all, get_connection
+from array import array
+import random
+import time
+
+# Last images shown in a pass can't come back within this many images of the next pass
+NO_REPEAT_GAP = 10
+
+# Recently shown images remembered per collection between sessions
+RECENT_WINDOW = 500
+
+
+class ShuffleScheduler:
+    """Shuffled pass orders without near repeats, favoring images not shown for longest.
+
+    Orders are permutations of playlist positions, built one pass at a time
+    in O(n), so each pick is O(1) amortized. The first pass puts images from
+    `recent` (positions shown in earlier sessions, oldest first) at the end,
+    in that order; every later pass keeps the previous pass's last
+    NO_REPEAT_GAP images out of its first NO_REPEAT_GAP slots.
+    """
+
+    def __init__(self, size, rng=None, recent=()):
+        self.size = size
+        self.rng = rng or random.Random()
+        self.gap = min(NO_REPEAT_GAP, size // 2)
+        self._orders = {0: self._first_pass(recent)}
+
+    def _first_pass(self, recent):
+        recent = list(dict.fromkeys(p for p in recent if 0 <= p < self.size))
+        seen = set(recent)
+        order = array('I', (p for p in range(self.size) if p not in seen))
+        self.rng.shuffle(order)
+        order.extend(recent)
+        return order
+
+    def _next_pass(self, previous):
+        tail = set(previous[len(previous) - self.gap:]) if previous and self.gap else set()
+        rest = array('I', (p for p in range(self.size) if p not in tail))
+        self.rng.shuffle(rest)
+        # Fresh images fill the head; the previous tail is mixed into the remainder
+        head, remainder = rest[:self.gap], rest[self.gap:]
+        remainder.extend(tail)
+        self.rng.shuffle(remainder)
+        head.extend(remainder)
+        return head
+
+    def pass_order(self, pass_number):
+        """Return the playlist positions shown in pass `pass_number`, in order."""
+        order = self._orders.get(pass_number)
+        if order is None:
+            order = self._next_pass(self._orders.get(pass_number - 1))
+            self._orders[pass_number] = order
+            # Only neighbouring passes can be reached by Back or prefetch
+            for stale in [p for p in self._orders if abs(p - pass_number) > 1]:
+                del self._orders[stale]
+        return order
+
+
+def load_recent_image_ids(collection_id):
+    """Image ids recently shown from a collection (-1 for "All"), oldest first."""
+    rows = fetch_all(
+        "SELECT image_id FROM recent_images WHERE collection_id = ? ORDER BY shown_at DESC LIMIT ?",
+        (collection_id, RECENT_WINDOW),
+    )
+    return [image_id for (image_id,) in reversed(rows)]
+
+
+def recent_positions(playlist, collection_id):
+    """Map a collection's recently shown ids to positions in `playlist`, oldest first."""
+    recent = load_recent_image_ids(collection_id)
+    if not recent:
+        return []
+    wanted = set(recent)
+    positions = {image_id: position for position, image_id in enumerate(playlist.image_ids) if image_id in wanted}
+    return [positions[image_id] for image_id in recent if image_id in positions]
+
+
+class ShownHistory:
+    """Collects images shown from a collection and saves them to recent_images in one go."""
+
+    def __init__(self, collection_id, clock=time.time):
+        self.collection_id = collection_id
+        self.clock = clock
+        self._shown = {}  # image_id -> time last shown
+
+    def mark(self, image_id):
+        self._shown[image_id] = self.clock()
+
+    def flush(self):
+        """Write what was shown since the last flush and trim the collection's window."""
+        if not self._shown:
+            return
+        rows = [(self.collection_id, image_id, shown_at) for image_id, shown_at in self._shown.items()]
+        self._shown = {}
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO recent_images (collection_id, image_id, shown_at) VALUES (?, ?, ?)", rows
+            )
+            conn.execute('''
+                DELETE FROM recent_images WHERE collection_id = ? AND image_id NOT IN (
+                    SELECT image_id FROM recent_images WHERE collection_id = ? ORDER BY shown_at DESC LIMIT ?
+                )
+            ''', (self.collection_id, self.collection_id, RECENT_WINDOW))
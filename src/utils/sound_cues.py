@@ -0,0 +1,174 @@
+from PyQt6.QtCore import QObject, QUrl
+from PyQt6.QtMultimedia import QSoundEffect, QAudioDecoder, QAudioFormat
+from storage import get_setting
+import hashlib
+import os
+import tempfile
+import wave
+
+# Bundled sounds, found relative to this file rather than the working directory
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# Cues the players can trigger
+CUE_COUNTDOWN = "countdown"  # Plays through the last COUNTDOWN_CUE_SECONDS of each image
+CUE_TRANSITION = "transition"  # Moving on to the next image
+CUE_BREAK_START = "break_start"
+CUE_BREAK_END = "break_end"
+
+# Sound file per cue, overridable with the "sound_cue_<cue>" setting (a file in
+# ASSETS_DIR or an absolute path; an empty value turns the cue off)
+DEFAULT_CUES = {
+    CUE_COUNTDOWN: "kahootSound.mp3",
+    CUE_TRANSITION: None,
+    CUE_BREAK_START: None,
+    CUE_BREAK_END: None,
+}
+
+COUNTDOWN_CUE_SECONDS = 10
+
+# Overridable with the "sound_cue_volume" setting
+DEFAULT_VOLUME = 0.5
+
+# Compressed sounds are decoded to WAV here once and reused on later starts
+DECODED_CUE_DIR = os.path.join(tempfile.gettempdir(), "morpice-sound-cues")
+
+
+def cue_source_path(cue):
+    """Return the sound file configured for `cue`, or None if the cue is off."""
+    name = get_setting(f"sound_cue_{cue}", DEFAULT_CUES.get(cue))
+    if not name:
+        return None
+    return name if os.path.isabs(name) else os.path.join(ASSETS_DIR, name)
+
+
+def decoded_wav_path(path):
+    """Where the PCM copy of a compressed sound file is kept; changes if the file does."""
+    stat = os.stat(path)
+    key = hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+    return os.path.join(DECODED_CUE_DIR, f"{key}.wav")
+
+
+class _CueDecoder(QObject):
+    """Decodes one compressed sound to 16-bit PCM and writes it out as a WAV file."""
+
+    def __init__(self, source, target, on_done, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.target = target
+        self.on_done = on_done
+        self.chunks = []
+        self.format = None
+
+        pcm = QAudioFormat()
+        pcm.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        self.decoder = QAudioDecoder(self)
+        self.decoder.setAudioFormat(pcm)
+        self.decoder.setSource(QUrl.fromLocalFile(source))
+        self.decoder.bufferReady.connect(self._on_buffer_ready)
+        self.decoder.finished.connect(self._on_finished)
+        self.decoder.error.connect(self._on_error)
+        self.decoder.start()
+
+    def _on_buffer_ready(self):
+        buffer = self.decoder.read()
+        if buffer.isValid():
+            self.format = buffer.format()
+            self.chunks.append(buffer.constData().asstring(buffer.byteCount()))
+
+    def _on_finished(self):
+        if self.format is None or self.format.sampleFormat() != QAudioFormat.SampleFormat.Int16:
+            print(f"Sound cue decode produced no 16-bit PCM: {self.source}")
+            self.on_done(self, None)
+            return
+        os.makedirs(DECODED_CUE_DIR, exist_ok=True)
+        partial = self.target + ".part"
+        with wave.open(partial, "wb") as out:
+            out.setnchannels(self.format.channelCount())
+            out.setsampwidth(2)
+            out.setframerate(self.format.sampleRate())
+            out.writeframes(b"".join(self.chunks))
+        os.replace(partial, self.target)
+        self.chunks = []
+        self.on_done(self, self.target)
+
+    def _on_error(self, error):
+        print(f"Sound cue decode error: {self.decoder.errorString()}")
+        self.on_done(self, None)
+
+
+class SoundCues(QObject):
+    """App-wide, preloaded sound cues for the players.
+
+    Every configured cue is loaded once at startup into a QSoundEffect, which
+    keeps uncompressed PCM in memory and starts with very little latency.
+    QSoundEffect only reads WAV, so other formats are decoded once with
+    QAudioDecoder and cached on disk as WAV.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.volume = float(get_setting("sound_cue_volume", DEFAULT_VOLUME))
+        self._effects = {}
+        self._decoders = []
+        for cue in DEFAULT_CUES:
+            self.load(cue)
+
+    def load(self, cue):
+        """(Re)load the sound configured for `cue`."""
+        self._effects.pop(cue, None)
+        path = cue_source_path(cue)
+        if path is None:
+            return
+        if not os.path.exists(path):
+            print(f"Sound cue file not found: {path}")
+            return
+        if path.lower().endswith(".wav"):
+            self._set_effect(cue, path)
+            return
+        wav_path = decoded_wav_path(path)
+        if os.path.exists(wav_path):
+            self._set_effect(cue, wav_path)
+        else:
+            self._decoders.append(_CueDecoder(path, wav_path, lambda decoder, result: self._on_decoded(cue, decoder, result), self))
+
+    def _on_decoded(self, cue, decoder, wav_path):
+        self._decoders.remove(decoder)
+        decoder.deleteLater()
+        if wav_path is not None:
+            self._set_effect(cue, wav_path)
+
+    def _set_effect(self, cue, wav_path):
+        effect = QSoundEffect(self)
+        effect.setSource(QUrl.fromLocalFile(wav_path))
+        effect.setVolume(self.volume)
+        self._effects[cue] = effect
+
+    def play(self, cue):
+        """Start `cue` unless it is already playing (or not loaded yet)."""
+        effect = self._effects.get(cue)
+        if effect is not None and not effect.isPlaying():
+            effect.play()
+
+    def stop(self, cue=None):
+        """Stop one cue, or all of them."""
+        for name, effect in self._effects.items():
+            if cue is None or name == cue:
+                effect.stop()
+
+    def update_countdown(self, remaining_seconds):
+        """Play the countdown cue through the last seconds of an image and stop it otherwise."""
+        if 0 < remaining_seconds <= COUNTDOWN_CUE_SECONDS:
+            self.play(CUE_COUNTDOWN)
+        else:
+            self.stop(CUE_COUNTDOWN)
+
+
+_sound_cues = None
+
+
+def get_sound_cues():
+    """Return the sound cues shared by every player; the first call loads them."""
+    global _sound_cues
+    if _sound_cues is None:
+        _sound_cues = SoundCues()
+    return _sound_cues
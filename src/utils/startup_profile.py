@@ -0,0 +1,44 @@
+import sys
+import time
+
+# Cold start budget, from the first line of main.py to the main window's first paint
+STARTUP_TARGET_SECONDS = 0.5
+
+# Modules that should only load once a window needing them is opened
+LAZY_MODULES = ("PyQt6.QtMultimedia", "ui.fixed_window", "ui.session_window", "ui.storage_window")
+
+
+class StartupProfile:
+    """Times the steps of startup; report() prints them when --profile-startup is given."""
+
+    def __init__(self, enabled=False, started=None, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.started = started if started is not None else clock()
+        self._last = self.started
+        self._modules = len(sys.modules)
+        self.steps = []  # (label, seconds, modules loaded)
+
+    def mark(self, label):
+        """Record the time and modules loaded since the previous mark under `label`."""
+        now = self.clock()
+        modules = len(sys.modules)
+        self.steps.append((label, now - self._last, modules - self._modules))
+        self._last = now
+        self._modules = modules
+
+    def total(self):
+        return self._last - self.started
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("Startup profile:")
+        for label, seconds, modules in self.steps:
+            print(f"  {label:<28} {seconds * 1000:8.1f} ms  {modules:4d} modules")
+        total = self.total()
+        verdict = "within" if total <= STARTUP_TARGET_SECONDS else "OVER"
+        print(f"  {'total':<28} {total * 1000:8.1f} ms  ({verdict} the {STARTUP_TARGET_SECONDS * 1000:.0f} ms target)")
+        loaded = [name for name in LAZY_MODULES if name in sys.modules]
+        if loaded:
+            print(f"  loaded eagerly: {', '.join(loaded)}")
@@ -0,0 +1,216 @@
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice, QSize
+from PyQt6.QtGui import QImage, QPainter
+from utils.image_decode import read_image
+from utils.cache_paths import cache_path
+from storage import open_connection, get_setting
+import os
+import threading
+import time
+
+# File name inside the app's cache directory (utils.cache_paths)
+THUMBNAIL_DB_NAME = "thumbnails.db"
+
+# Standard thumbnail edge lengths; requests are served from the smallest size that fits
+THUMBNAIL_SIZES = (64, 100, 200, 400)
+
+# Default on-disk budget, overridable with the "thumbnail_cache_bytes" setting
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+# When over budget, evict least recently used entries down to this fraction
+EVICT_TO_FRACTION = 0.9
+
+JPEG_QUALITY = 85
+
+# Cache hits only record their last-use time in memory; it's written out in
+# one statement once this many are pending, on every put() and on flush()/close()
+TOUCH_FLUSH_ENTRIES = 256
+
+
+def standard_size(size):
+    """Return the smallest standard thumbnail size that is at least `size`."""
+    for standard in THUMBNAIL_SIZES:
+        if standard >= size:
+            return standard
+    return THUMBNAIL_SIZES[-1]
+
+
+def decode_thumbnail(path, size):
+    """Decode an image file straight to at most size x size, keeping aspect ratio."""
+    image = read_image(path, QSize(size, size))
+    if image.isNull():
+        return image
+    if image.width() > size or image.height() > size:
+        # Formats without scaled decoding (or unknown header size) land here
+        image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+def encode_image(image):
+    """Encode a thumbnail as JPEG, or PNG when it has transparency."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if image.hasAlphaChannel():
+        image.save(buffer, "PNG")
+    else:
+        image.save(buffer, "JPG", JPEG_QUALITY)
+    buffer.close()
+    return data.data()
+
+
+class ThumbnailCache:
+    """Content-keyed thumbnail store on disk with an LRU byte budget.
+
+    Entries are keyed by (path, mtime, file size, thumbnail size), so an
+    edited or replaced file gets a fresh thumbnail. Safe to call from
+    worker threads.
+    """
+
+    def __init__(self, path=None, budget_bytes=None):
+        if path is None:
+            path = cache_path(THUMBNAIL_DB_NAME)
+        if budget_bytes is None:
+            budget_bytes = int(get_setting("thumbnail_cache_bytes", DEFAULT_BUDGET_BYTES))
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last use time, not yet written
+        self._conn = open_connection(path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbnails_last_used ON thumbnails (last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbnails").fetchone()[0]
+
+    @staticmethod
+    def make_key(path, size):
+        """Build the cache key for a file, or None if it can't be stat'ed."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return f"{path}|{stat.st_mtime_ns}|{stat.st_size}|{size}"
+
+    def get(self, path, size):
+        """Return a QImage thumbnail of at most size x size, generating it on a miss.
+
+        Returns a null QImage if the file can't be read.
+        """
+        size = standard_size(size)
+        key = self.make_key(path, size)
+        if key is None:
+            return QImage()
+
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM thumbnails WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                # Reads stay reads; the LRU order only needs to be roughly current
+                self._touched[key] = time.time()
+                if len(self._touched) >= TOUCH_FLUSH_ENTRIES:
+                    self._flush_touched()
+                    self._conn.commit()
+        if row is not None:
+            image = QImage.fromData(row[0])
+            if not image.isNull():
+                return image
+
+        image = decode_thumbnail(path, size)
+        if not image.isNull():
+            self.put(key, encode_image(image))
+        return image
+
+    def put(self, key, data):
+        """Store encoded thumbnail bytes and evict old entries if over budget."""
+        with self._lock:
+            self._flush_touched()  # Eviction must see recent hits
+            old = self._conn.execute("SELECT bytes FROM thumbnails WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnails (key, data, bytes, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time())
+            )
+            self._total_bytes += len(data) - (old[0] if old else 0)
+            if self._total_bytes > self.budget_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        """Write pending last-use times (the caller commits)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE thumbnails SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop least recently used entries until under the eviction target."""
+        target = int(self.budget_bytes * EVICT_TO_FRACTION)
+        cursor = self._conn.execute("SELECT key, bytes FROM thumbnails ORDER BY last_used")
+        doomed = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM thumbnails WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM thumbnails")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def flush(self):
+        """Write pending last-use times now."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Return the app-wide thumbnail cache shared by every list and preview."""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        with _thumbnail_cache_lock:
+            if _thumbnail_cache is None:
+                _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
+
+
+def flush_thumbnail_cache():
+    """Save pending last-use times (called on application exit).
+
+    The connection stays open: thumbnail workers may still be finishing.
+    """
+    if _thumbnail_cache is not None:
+        _thumbnail_cache.flush()
+
+
+def padded_thumbnail(image, size, background):
+    """Center a thumbnail on a size x size square filled with `background`."""
+    canvas = QImage(size, size, QImage.Format.Format_RGB32)
+    canvas.fill(background)
+    if not image.isNull():
+        if image.width() > size or image.height() > size:
+            image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        painter = QPainter(canvas)
+        painter.drawImage((size - image.width()) // 2, (size - image.height()) // 2, image)
+        painter.end()
+    return canvas
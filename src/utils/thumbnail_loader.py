@@ -0,0 +1,78 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage
+from utils.thumbnail_cache import get_thumbnail_cache, padded_thumbnail
+
+# Queue priorities; QThreadPool runs higher numbers first
+PRIORITY_NORMAL = 0
+PRIORITY_VISIBLE = 1
+
+
+class _ThumbnailSignals(QObject):
+    # QRunnable isn't a QObject, so tasks report back through this
+    loaded = pyqtSignal(object, QImage)
+
+
+class _ThumbnailTask(QRunnable):
+    """Loads one thumbnail off the GUI thread using QImage only."""
+
+    def __init__(self, key, path, size, background, signals):
+        super().__init__()
+        self.setAutoDelete(False)  # The loader keeps the reference until it reports back
+        self.key = key
+        self.path = path
+        self.size = size
+        self.background = background
+        self.signals = signals
+
+    def run(self):
+        image = get_thumbnail_cache().get(self.path, self.size)
+        if not image.isNull() and self.background is not None:
+            image = padded_thumbnail(image, self.size, self.background)
+        self.signals.loaded.emit(self.key, image)
+
+
+class ThumbnailLoader(QObject):
+    """Generates thumbnails on a thread pool and emits them as they complete.
+
+    Callers show a placeholder right away and request thumbnails for the rows
+    currently on screen; re-requesting a queued key at a higher priority
+    moves it to the front.
+    """
+    thumbnail_ready = pyqtSignal(object, QImage)  # key, image (null if unreadable)
+
+    def __init__(self, size, background=None, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.background = background
+        self.pool = QThreadPool(self)
+        get_thumbnail_cache()  # Create the shared cache on the GUI thread before workers use it
+        self._signals = _ThumbnailSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._pending = {}
+
+    def request(self, key, path, priority=PRIORITY_NORMAL):
+        """Queue a thumbnail for `path`; thumbnail_ready fires with `key` when done."""
+        if key in self._pending:
+            if priority > PRIORITY_NORMAL:
+                self.prioritize([key])
+            return
+        task = _ThumbnailTask(key, path, self.size, self.background, self._signals)
+        self._pending[key] = task
+        self.pool.start(task, priority)
+
+    def prioritize(self, keys):
+        """Move queued requests for `keys` ahead of everything else."""
+        for key in keys:
+            task = self._pending.get(key)
+            if task is not None and self.pool.tryTake(task):
+                self.pool.start(task, PRIORITY_VISIBLE)
+
+    def cancel_all(self):
+        """Drop every request that hasn't started yet."""
+        self.pool.clear()
+        self._pending.clear()
+
+    def _on_loaded(self, key, image):
+        if self._pending.pop(key, None) is not None:
+            self.thumbnail_ready.emit(key, image)
+
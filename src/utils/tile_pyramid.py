@@ -0,0 +1,345 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QRect, QPoint, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QImageIOHandler, QTransform
+from storage import get_setting
+from utils.cache_paths import cache_path
+from collections import OrderedDict
+import hashlib
+import math
+import os
+import shutil
+import threading
+
+# Edge length of a tile in the pixels of its pyramid level
+TILE_SIZE = 512
+
+# Directory name inside the app's cache directory (utils.cache_paths)
+TILE_CACHE_DIR = "tile_cache"
+
+# Default on-disk budget, overridable with the "tile_cache_bytes" setting
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+
+# When over budget, evict least recently opened images down to this fraction
+EVICT_TO_FRACTION = 0.9
+
+# Tiles kept decoded in memory, as a multiple of the tiles currently on screen
+MEMORY_TILES_FACTOR = 2
+MIN_MEMORY_TILES = 16
+
+TILE_THREADS = 2
+
+JPEG_QUALITY = 90
+
+Transformation = QImageIOHandler.Transformation
+
+
+def _map_to_raw(rect, raw_size, transform):
+    """Map a rect in displayed (auto-transformed) coordinates to the file's stored orientation.
+
+    Qt applies EXIF transforms as mirror/flip first, then a clockwise quarter
+    turn; this undoes them in reverse order.
+    """
+    x, y, w, h = rect.x(), rect.y(), rect.width(), rect.height()
+    if transform & Transformation.TransformationRotate90:
+        x, y, w, h = y, raw_size.height() - x - w, h, w
+    if transform & Transformation.TransformationMirror:
+        x = raw_size.width() - x - w
+    if transform & Transformation.TransformationFlip:
+        y = raw_size.height() - y - h
+    return QRect(x, y, w, h)
+
+
+def _apply_transform(image, transform):
+    """Turn a region decoded in stored orientation into displayed orientation."""
+    mirror = bool(transform & Transformation.TransformationMirror)
+    flip = bool(transform & Transformation.TransformationFlip)
+    if mirror or flip:
+        image = image.mirrored(mirror, flip)
+    if transform & Transformation.TransformationRotate90:
+        image = image.transformed(QTransform().rotate(90))
+    return image
+
+
+def _save_tile(image, path):
+    # Write then rename so a reader never sees a half-written tile
+    temporary = path + ".tmp"
+    if image.hasAlphaChannel():
+        image.save(temporary, "PNG")
+    else:
+        image.save(temporary, "JPG", JPEG_QUALITY)
+    os.replace(temporary, path)
+
+
+class TileCache:
+    """Tile pyramids on disk, one directory per source file version, trimmed to a byte budget.
+
+    Directories are keyed by (path, mtime, file size), so an edited file gets
+    fresh tiles. A directory's mtime records when its image was last opened.
+    """
+
+    def __init__(self, root=None, budget_bytes=None):
+        if root is None:
+            root = cache_path(TILE_CACHE_DIR)
+        if budget_bytes is None:
+            budget_bytes = int(get_setting("tile_cache_bytes", DEFAULT_BUDGET_BYTES))
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+
+    def image_dir(self, path):
+        """Return (creating it if needed) the directory holding `path`'s tiles."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = hashlib.sha1(f"{path}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8")).hexdigest()
+        directory = os.path.join(self.root, key)
+        os.makedirs(directory, exist_ok=True)
+        os.utime(directory)
+        return directory
+
+    def trim(self):
+        """Delete the least recently opened pyramids until the cache is within budget."""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+            except OSError:
+                return
+            pyramids = []
+            total = 0
+            for entry in entries:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+                pyramids.append((entry.stat().st_mtime, size, entry.path))
+                total += size
+            if total <= self.budget_bytes:
+                return
+            target = self.budget_bytes * EVICT_TO_FRACTION
+            for _, size, directory in sorted(pyramids):
+                if total <= target:
+                    break
+                shutil.rmtree(directory, ignore_errors=True)
+                total -= size
+
+
+_tile_cache = None
+_tile_cache_lock = threading.Lock()
+
+
+def get_tile_cache():
+    """Return the process-wide tile cache, creating it on first use."""
+    global _tile_cache
+    if _tile_cache is None:
+        with _tile_cache_lock:
+            if _tile_cache is None:
+                _tile_cache = TileCache()
+    return _tile_cache
+
+
+class TiledImage:
+    """One source image as a pyramid of TILE_SIZE tiles, decoded region by region.
+
+    Level 0 is full resolution and each level halves the one below, up to the
+    first level that fits in a single tile. Tiles are decoded with
+    QImageReader.setClipRect (and setScaledSize above level 0), so only the
+    region being looked at is ever in memory, and are saved to the tile cache
+    so revisiting a region skips the decode. Formats whose reader can't clip
+    are decoded once in full and cut into every tile in one go.
+    """
+
+    def __init__(self, path, cache=None):
+        self.path = path
+        self.cache = cache or get_tile_cache()
+        reader = QImageReader(path)
+        self.raw_size = reader.size()
+        self.transform = reader.transformation()
+        swapped = bool(self.transform & Transformation.TransformationRotate90)
+        self.size = self.raw_size.transposed() if swapped and self.raw_size.isValid() else self.raw_size
+        self.clip_supported = reader.supportsOption(QImageIOHandler.ImageOption.ClipRect)
+        self.levels = 1
+        if self.is_valid():
+            while max(self.size.width(), self.size.height()) > TILE_SIZE << (self.levels - 1):
+                self.levels += 1
+        self._directory = None
+        self._lock = threading.Lock()
+
+    def is_valid(self):
+        return self.size.isValid() and not self.size.isEmpty()
+
+    def level_for(self, device_scale):
+        """Coarsest level that still has at least one pixel per device pixel at `device_scale`."""
+        if device_scale >= 1.0:
+            return 0
+        return min(self.levels - 1, int(math.floor(math.log2(1.0 / device_scale))))
+
+    def tile_rect(self, level, col, row):
+        """Area of the full-resolution image (displayed orientation) covered by a tile."""
+        span = TILE_SIZE << level
+        return QRect(col * span, row * span, span, span).intersected(QRect(QPoint(0, 0), self.size))
+
+    def tiles_in(self, level, rect):
+        """(col, row) of the tiles at `level` that intersect `rect` (full-resolution coordinates)."""
+        span = TILE_SIZE << level
+        left = max(0, int(rect.left()) // span)
+        top = max(0, int(rect.top()) // span)
+        right = min((self.size.width() - 1) // span, int(math.ceil(rect.right())) // span)
+        bottom = min((self.size.height() - 1) // span, int(math.ceil(rect.bottom())) // span)
+        return [(col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)]
+
+    def _tile_path(self, level, col, row):
+        if self._directory is None:
+            self._directory = self.cache.image_dir(self.path)
+        if self._directory is None:
+            return None
+        return os.path.join(self._directory, f"{level}_{col}_{row}")
+
+    def load_tile(self, level, col, row):
+        """Return a tile as a QImage, from the cache or decoded now (safe off the GUI thread)."""
+        path = self._tile_path(level, col, row)
+        if path is not None and os.path.exists(path):
+            image = QImage(path)
+            if not image.isNull():
+                return image
+        if not self.clip_supported:
+            return self._cut_all_tiles(level, col, row)
+
+        rect = self.tile_rect(level, col, row)
+        raw_rect = _map_to_raw(rect, self.raw_size, self.transform)
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(False)
+        reader.setClipRect(raw_rect)
+        if level:
+            scale = 1 << level
+            reader.setScaledSize(QSize(
+                max(1, math.ceil(raw_rect.width() / scale)), max(1, math.ceil(raw_rect.height() / scale))
+            ))
+        image = reader.read()
+        if image.isNull():
+            return QImage()
+        image = _apply_transform(image, self.transform)
+        if path is not None:
+            _save_tile(image, path)
+        return image
+
+    def _cut_all_tiles(self, level, col, row):
+        # Runs at most once per image; the lock keeps worker threads from each decoding it
+        with self._lock:
+            path = self._tile_path(level, col, row)
+            if path is not None and os.path.exists(path):
+                return QImage(path)
+            reader = QImageReader(self.path)
+            reader.setAutoTransform(True)
+            image = reader.read()
+            if image.isNull():
+                return QImage()
+            wanted = QImage()
+            for current in range(self.levels):
+                if current:
+                    image = image.scaled(
+                        max(1, math.ceil(self.size.width() / (1 << current))),
+                        max(1, math.ceil(self.size.height() / (1 << current))),
+                        Qt.AspectRatioMode.IgnoreAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation,
+                    )
+                columns = math.ceil(image.width() / TILE_SIZE)
+                rows = math.ceil(image.height() / TILE_SIZE)
+                for r in range(rows):
+                    for c in range(columns):
+                        x, y = c * TILE_SIZE, r * TILE_SIZE
+                        tile = image.copy(x, y, min(TILE_SIZE, image.width() - x), min(TILE_SIZE, image.height() - y))
+                        if (current, c, r) == (level, col, row):
+                            wanted = tile
+                        tile_path = self._tile_path(current, c, r)
+                        if tile_path is not None:
+                            _save_tile(tile, tile_path)
+            return wanted
+
+
+class _TileSignals(QObject):
+    loaded = pyqtSignal(str, int, int, int, QImage)
+
+
+class _TileTask(QRunnable):
+    def __init__(self, image, key, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.image = image
+        self.key = key
+        self.signals = signals
+
+    def run(self):
+        level, col, row = self.key
+        self.signals.loaded.emit(self.image.path, level, col, row, self.image.load_tile(level, col, row))
+
+
+class _TrimTask(QRunnable):
+    def run(self):
+        get_tile_cache().trim()
+
+
+class TileLoader(QObject):
+    """Loads tiles of the image being zoomed into on worker threads.
+
+    visible_tiles() returns the tiles already in memory and queues the rest;
+    tile_ready fires as each arrives. Only the latest visible set stays
+    queued, and the in-memory tiles are capped at a multiple of what fits on
+    screen, so memory follows the screen rather than the source image.
+    """
+
+    tile_ready = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(TILE_THREADS)
+        self._signals = _TileSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self.image = None  # TiledImage of the current source, or None
+        self._tiles = OrderedDict()  # (level, col, row) -> QImage
+        self._pending = {}  # (level, col, row) -> task
+        self._max_tiles = MIN_MEMORY_TILES
+
+    def set_source(self, path):
+        """Switch to tiling `path` (None to drop the current image)."""
+        if self.image is not None and self.image.path == path:
+            return
+        for task in self._pending.values():
+            self.pool.tryTake(task)
+        self._pending.clear()
+        self._tiles.clear()
+        self.image = TiledImage(path) if path else None
+        if self.image is not None:
+            self.pool.start(_TrimTask(), -1)
+
+    def visible_tiles(self, level, rect):
+        """Return {(level, col, row): QImage} for tiles covering `rect`, loading missing ones."""
+        if self.image is None or not self.image.is_valid():
+            return {}
+        keys = [(level, col, row) for col, row in self.image.tiles_in(level, rect)]
+        self._max_tiles = max(MIN_MEMORY_TILES, MEMORY_TILES_FACTOR * len(keys))
+        wanted = set(keys)
+        for key, task in list(self._pending.items()):
+            if key not in wanted and self.pool.tryTake(task):
+                del self._pending[key]
+
+        found = {}
+        for key in keys:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                found[key] = tile
+            elif key not in self._pending:
+                task = _TileTask(self.image, key, self._signals)
+                self._pending[key] = task
+                self.pool.start(task)
+        return found
+
+    def _on_loaded(self, path, level, col, row, image):
+        key = (level, col, row)
+        if self.image is None or path != self.image.path:
+            return  # Finished after the player moved on
+        self._pending.pop(key, None)
+        if image.isNull():
+            return
+        self._tiles[key] = image
+        while len(self._tiles) > self._max_tiles:
+            self._tiles.popitem(last=False)
+        self.tile_ready.emit()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from src/ with its modules imported top-level (python main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from utils.perceptual_hash import HammingIndex, DUPLICATE_DISTANCE
+from itertools import combinations
+import random
+import time
+
+
+def brute_force_groups(items, max_distance):
+    parent = {}
+
+    def find(image_id):
+        while parent.get(image_id, image_id) != image_id:
+            image_id = parent[image_id]
+        return image_id
+
+    for (a, hash_a), (b, hash_b) in combinations(items, 2):
+        if (hash_a ^ hash_b).bit_count() <= max_distance:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+    groups = {}
+    for image_id, _ in items:
+        groups.setdefault(find(image_id), []).append(image_id)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+
+def skewed_hashes(count, rng):
+    """Random hashes where half share an all-zero chunk (flat backgrounds) and some are near copies."""
+    items = []
+    for image_id in range(count):
+        value = rng.getrandbits(64)
+        if image_id % 2:
+            value &= ~0xFFFF
+        if items and rng.random() < 0.2:
+            value = rng.choice(items)[1]
+            for _ in range(rng.randint(0, DUPLICATE_DISTANCE + 1)):
+                value ^= 1 << rng.randrange(64)
+        items.append((image_id, value))
+    return items
+
+
+@pytest.mark.parametrize("max_distance", range(DUPLICATE_DISTANCE + 1))
+def test_duplicate_groups_match_brute_force_on_skewed_buckets(max_distance):
+    items = skewed_hashes(1500, random.Random(max_distance))
+    assert HammingIndex(items).duplicate_groups(max_distance) == brute_force_groups(items, max_distance)
+
+
+def test_skewed_bucket_isnt_quadratic():
+    rng = random.Random(7)
+    # 5% of 100k share one chunk: 5000 in a bucket, 12.5M pairs if compared naively
+    items = [(i, rng.getrandbits(64) & (~0xFFFF if i % 20 == 0 else -1)) for i in range(100_000)]
+    index = HammingIndex(items)
+    started = time.perf_counter()
+    index.duplicate_groups()
+    assert time.perf_counter() - started < 2.0
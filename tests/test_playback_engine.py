@@ -0,0 +1,44 @@
+from utils.playback_engine import PlaybackEngine, ManualClock, fixed_plan, SLOT_CHANGED
+from utils.playlist import Playlist
+
+
+class RecordingHistory:
+    """Stands in for ShownHistory without a database."""
+
+    def __init__(self):
+        self.marked = []
+        self.flushes = 0
+
+    def mark(self, image_id):
+        self.marked.append(image_id)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_tick_after_close_does_nothing():
+    clock = ManualClock()
+    history = RecordingHistory()
+    engine = PlaybackEngine(Playlist.from_paths(["a", "b", "c"]), fixed_plan(30), clock=clock, history=history)
+    events = []
+    engine.subscribe(lambda event, engine: events.append(event))
+    engine.start()
+    clock.advance(10)
+
+    engine.close()
+    assert not engine.running
+    assert engine.last_display.actual_seconds == 10
+    marked, flushes = list(history.marked), history.flushes
+    events.clear()
+
+    for _ in range(5):
+        clock.advance(30)
+        assert engine.tick() is False
+    engine.next()
+    engine.previous()
+    engine.start()
+
+    assert engine.current_slot == 0
+    assert SLOT_CHANGED not in events
+    assert history.marked == marked
+    assert history.flushes == flushes